@@ -0,0 +1,246 @@
+"""
+화재 알림 디스패처 모듈
+- 기기별 쿨다운·격상(escalation) 상태를 유지하여 지속되는 화재 이벤트에서 알림 폭주 방지
+  (MEDIUM → HIGH 격상 시에는 쿨다운과 무관하게 즉시 발송)
+- 상태 초기화는 MEDIUM 미만이 ALERT_RECOVERY_SEC 동안 지속된 뒤에만 (임계값 부근 진동 시 쿨다운 유지)
+- 쿨다운/격상은 공유 저장소의 원자적 선점(add, Redis는 SET NX PX)으로 판단 → 여러 워커 중 하나만 발송
+- 교체 가능한 싱크(Socket.IO, 웹훅, 이메일 스텁)로 팬아웃
+- 크기 제한 큐 + 워커 스레드 풀에서 발송하므로 느린 외부 알림이 수신 요청 지연에 영향 없음
+  (큐가 가득 차 하나도 넣지 못하면 선점을 해제하여 다음 측정값에서 다시 발송)
+- 발송/억제/실패/유실 건수 집계
+
+환경 변수:
+    ALERT_COOLDOWN_SEC=60
+    ALERT_RECOVERY_SEC=300
+    ALERT_WORKERS=4
+    ALERT_QUEUE_SIZE=256
+    ALERT_WEBHOOK_URL=            (설정 시 웹훅 싱크 사용)
+    ALERT_WEBHOOK_TIMEOUT_SEC=5
+    ALERT_EMAIL_TO=               (쉼표 구분, 설정 시 이메일 스텁 싱크 사용)
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+
+from dotenv import load_dotenv
+
+from cluster import LocalStateStore
+from fire_detector import is_fire_emergency
+
+load_dotenv()
+
+LEVEL_ORDER: Dict[str, int] = {"SAFE": 0, "LOW": 1, "MEDIUM": 2, "HIGH": 3}
+ALERT_STATE_TTL_SEC: float = 24 * 3600.0  # 마지막 발송 등급 보관 시간
+
+
+# -----------------------------
+# 싱크
+# -----------------------------
+class SocketIOSink:
+    """대시보드 클라이언트에게 fire_alert 이벤트 전송 (멀티 워커 브로드캐스터 경유)"""
+    name = "socketio"
+
+    def __init__(self, broadcaster) -> None:
+        self._broadcaster = broadcaster
+
+    def send(self, alert: Dict[str, Any]) -> None:
+        self._broadcaster.emit("fire_alert", alert)
+
+
+class WebhookSink:
+    """외부 웹훅으로 JSON POST"""
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 5.0) -> None:
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert: Dict[str, Any]) -> None:
+        body = json.dumps(alert, ensure_ascii=False, default=str).encode("utf-8")
+        req = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            if resp.status >= 400:
+                raise RuntimeError(f"웹훅 응답 오류: HTTP {resp.status}")
+
+
+class EmailSink:
+    """이메일 발송 스텁 - 실제 SMTP 연동 전까지 콘솔 출력"""
+    name = "email"
+
+    def __init__(self, recipients: List[str]) -> None:
+        self.recipients = recipients
+
+    def send(self, alert: Dict[str, Any]) -> None:
+        print(f"📧 [이메일 스텁] 받는 사람: {', '.join(self.recipients)}")
+        print(f"    제목: [{alert['level']}] 화재 알림 - {alert['device_id']}")
+        print(f"    내용: {alert['message']}")
+
+
+# -----------------------------
+# 디스패처
+# -----------------------------
+class AlertDispatcher:
+    """기기별 쿨다운/격상 판단 후 워커 풀로 알림 발송"""
+
+    def __init__(
+        self,
+        sinks: List[Any],
+        store=None,
+        *,
+        cooldown_sec: Optional[int] = None,
+        recovery_sec: Optional[int] = None,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ) -> None:
+        self.sinks = sinks
+        self._store = store if store is not None else LocalStateStore()
+        self.cooldown_sec = cooldown_sec if cooldown_sec is not None else int(os.getenv("ALERT_COOLDOWN_SEC", 60))
+        self.recovery_sec = recovery_sec if recovery_sec is not None else int(os.getenv("ALERT_RECOVERY_SEC", 300))
+        self.workers = workers or int(os.getenv("ALERT_WORKERS", 4))
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size or int(os.getenv("ALERT_QUEUE_SIZE", 256)))
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+        self.counts: Dict[str, int] = {"sent": 0, "escalated": 0, "suppressed": 0, "dropped": 0}
+        self.delivered: Dict[str, int] = {sink.name: 0 for sink in sinks}
+        self.failed: Dict[str, int] = {sink.name: 0 for sink in sinks}
+
+    def _ensure_workers(self) -> None:
+        # 워커는 첫 알림 시점에 시작 (디버그 리로더 감시 프로세스에서는 생성되지 않음)
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"alert-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, device_id: str, fire_risk: Dict[str, Any], message: str, data: Dict[str, Any]) -> str:
+        """
+        알림 발송 여부를 판단하고 발송 작업을 큐에 넣음
+        (요청 스레드에서는 공유 저장소 조회/선점만 수행, 외부 알림 발송 I/O는 워커에서)
+
+        Returns:
+            "none"(알림 대상 아님) / "queued" / "escalated" / "suppressed" / "dropped"
+        """
+        level = fire_risk.get("risk_level")
+        if LEVEL_ORDER.get(level, 0) < LEVEL_ORDER["MEDIUM"]:
+            # 상태는 건드리지 않음 - MEDIUM 이상이 recovery_sec 동안 없으면 active 키가 만료되어 초기화됨
+            return "none"
+
+        cooldown_key = f"alert:{device_id}:cooldown"
+        escalation_key = f"alert:{device_id}:escalation"
+        level_key = f"alert:{device_id}:level"
+        active_key = f"alert:{device_id}:active"
+        now = time.time()
+
+        if self.recovery_sec > 0:
+            if self._store.add(active_key, now, ttl=self.recovery_sec):
+                # 직전 이벤트 이후 recovery_sec 동안 정상 → 새 이벤트는 쿨다운 없이 바로 알림
+                for key in (cooldown_key, escalation_key, level_key):
+                    self._store.delete(key)
+            else:
+                self._store.set(active_key, now, ttl=self.recovery_sec)
+
+        escalating = is_fire_emergency(fire_risk) and self._store.get(level_key) == "MEDIUM"
+        claimed = [cooldown_key] if self.cooldown_sec > 0 else []
+        if not claimed or self._store.add(cooldown_key, now, ttl=self.cooldown_sec):
+            escalated = escalating
+        elif escalating and self._store.add(escalation_key, now, ttl=self.cooldown_sec):
+            # 쿨다운 중 격상 → 한 워커만 즉시 발송하고 쿨다운 재시작
+            escalated = True
+            claimed.append(escalation_key)
+            self._store.set(cooldown_key, now, ttl=self.cooldown_sec)
+        else:
+            with self._lock:
+                self.counts["suppressed"] += 1
+            return "suppressed"
+
+        alert = {
+            "level": level,
+            "device_id": device_id,
+            "message": message,
+            "escalated": escalated,
+            "ts": now,
+            "data": data,
+        }
+
+        self._ensure_workers()
+        queued = 0
+        for sink in self.sinks:
+            try:
+                self._queue.put_nowait((sink, alert))
+                queued += 1
+            except queue.Full:
+                with self._lock:
+                    self.counts["dropped"] += 1
+                print(f"알림 큐 가득 참 - {sink.name} 알림 유실 (기기: {device_id})")
+
+        if not queued:
+            # 아무 싱크에도 넣지 못함 → 선점 해제 (다음 측정값이 쿨다운에 막히지 않도록)
+            for key in claimed:
+                self._store.delete(key)
+            return "dropped"
+
+        self._store.set(level_key, level, ttl=ALERT_STATE_TTL_SEC)
+        with self._lock:
+            self.counts["escalated" if escalated else "sent"] += 1
+        if queued < len(self.sinks):
+            return "dropped"
+        return "escalated" if escalated else "queued"
+
+    def _worker(self) -> None:
+        while True:
+            sink, alert = self._queue.get()
+            try:
+                sink.send(alert)
+                with self._lock:
+                    self.delivered[sink.name] += 1
+            except Exception as e:
+                with self._lock:
+                    self.failed[sink.name] += 1
+                print(f"알림 발송 실패 ({sink.name}, 기기: {alert['device_id']}): {e}")
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cooldown_sec": self.cooldown_sec,
+                "recovery_sec": self.recovery_sec,
+                "sinks": [sink.name for sink in self.sinks],
+                "alerts": dict(self.counts),
+                "delivered": dict(self.delivered),
+                "failed": dict(self.failed),
+                "queue_size": self._queue.qsize(),
+                "workers": len(self._threads),
+            }
+
+
+def create_sinks(broadcaster) -> List[Any]:
+    """환경 변수에 맞는 싱크 목록 생성 (Socket.IO는 항상 포함)"""
+    sinks: List[Any] = [SocketIOSink(broadcaster)]
+    webhook_url = os.getenv("ALERT_WEBHOOK_URL")
+    if webhook_url:
+        sinks.append(WebhookSink(webhook_url, float(os.getenv("ALERT_WEBHOOK_TIMEOUT_SEC", 5))))
+    email_to = os.getenv("ALERT_EMAIL_TO")
+    if email_to:
+        sinks.append(EmailSink([r.strip() for r in email_to.split(",") if r.strip()]))
+    return sinks
+
+
+__all__ = [
+    "SocketIOSink",
+    "WebhookSink",
+    "EmailSink",
+    "AlertDispatcher",
+    "create_sinks",
+]
@@ -0,0 +1,236 @@
+"""
+스트리밍 이상 탐지 모듈
+기기별 센서 기준선(EWMA 평균/분산)을 상수 메모리로 유지하고,
+기준선 대비 z-score 또는 변화율이 벗어난 값을 이상으로 표시
+- 갱신 비용 O(1) (기기당 상태 저장소 get/set 1회)
+- 화재 방향(온도·TVOC·eCO2 상승, 습도 하강)만 점수에 반영
+- 기준선 갱신 가중치는 샘플 수가 아닌 경과 시간 기준 (alpha = 1 - exp(-dt/tau))
+  → 전송 주기와 무관하게 수 시간 단위 기준선을 유지하여 천천히 진행되는 훈소도 흡수되지 않음
+- 워밍업도 샘플 수가 아닌 경과 시간 기준, 분산은 누적 가중치로 보정 (초기 분산 과소추정 방지)
+- 이상값은 작은 가중치로만 기준선에 반영
+- 기기 상태는 STATE_TTL_SEC 동안 수신이 없으면 만료 (기준선 재학습)
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Optional
+import math
+
+from cluster import LocalStateStore
+
+
+# -----------------------------
+# 파라미터
+# -----------------------------
+BASELINE_TAU_SEC: float = 3 * 3600.0  # 값 기준선 시간 상수 (약 3시간 메모리)
+RATE_TAU_SEC: float = 1800.0          # 변화율 기준선 시간 상수 (약 30분 메모리)
+ANOMALY_ALPHA_FACTOR: float = 0.1     # 이상값일 때 기준선 갱신 가중치 배율
+WARMUP_SEC: float = 900.0         # 첫 수신 후 이 시간 동안은 판정하지 않음
+MIN_WARMUP_SAMPLES: int = 10      # 워밍업 시간이 지나도 이 샘플 수 이전에는 판정하지 않음
+STATE_TTL_SEC: float = 24 * 3600.0  # 수신이 없으면 기준선 상태 만료
+Z_THRESHOLD: float = 3.0          # 기준선 대비 편차 판정 기준
+RATE_Z_THRESHOLD: float = 4.0     # 변화율 판정 기준
+MAX_RATE_GAP_SEC: float = 300.0   # 이보다 오래된 직전값으로는 변화율 계산 안 함
+
+# 센서별 화재 방향 (+1: 상승이 위험, -1: 하강이 위험)
+ANOMALY_DIRECTIONS: Dict[str, int] = {
+    "temperature": 1,
+    "tvoc": 1,
+    "eco2": 1,
+    "humidity": -1,
+}
+
+# 표준편차 하한 (평탄한 신호에서 z-score 폭주 방지)
+MIN_STD: Dict[str, float] = {
+    "temperature": 0.3,   # °C
+    "tvoc": 15.0,         # ppb
+    "eco2": 30.0,         # ppm
+    "humidity": 1.5,      # %
+}
+
+# 변화율 표준편차 하한 (분당)
+MIN_RATE_STD: Dict[str, float] = {
+    "temperature": 0.2,   # °C/min
+    "tvoc": 20.0,         # ppb/min
+    "eco2": 40.0,         # ppm/min
+    "humidity": 1.0,      # %/min
+}
+
+# 센서별 이상 점수 (판정 시 가산)
+ANOMALY_WEIGHTS: Dict[str, int] = {
+    "temperature": 15,
+    "tvoc": 10,
+    "eco2": 10,
+    "humidity": 5,
+}
+
+ANOMALY_MAX_BONUS: int = 30  # 이상 탐지 요소의 총 가산 상한
+
+LABELS: Dict[str, str] = {"temperature": "온도", "tvoc": "TVOC", "eco2": "eCO2", "humidity": "습도"}
+UNITS: Dict[str, str] = {"temperature": "°C", "tvoc": "ppb", "eco2": "ppm", "humidity": "%"}
+
+
+# -----------------------------
+# 유틸
+# -----------------------------
+def _to_float(x: Any) -> Optional[float]:
+    try:
+        value = float(x)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _time_alpha(dt: float, tau: float) -> float:
+    """경과 시간 dt에 대한 EWMA 가중치 (전송 주기와 무관한 시간 상수 tau)"""
+    if dt <= 0:
+        return 0.0
+    return 1.0 - math.exp(-dt / tau)
+
+
+def _ewma_update(mean: float, var: float, x: float, alpha: float):
+    """EWMA 평균/분산 증분 갱신"""
+    diff = x - mean
+    incr = alpha * diff
+    return mean + incr, (1 - alpha) * (var + diff * incr)
+
+
+def _accumulate(weight: float, alpha: float) -> float:
+    """지금까지 기준선에 반영된 누적 가중치 (0~1, 분산 보정용)"""
+    return 1.0 - (1.0 - weight) * (1.0 - alpha)
+
+
+def _std(var: float, weight: float, floor: float) -> float:
+    """누적 가중치로 보정한 표준편차 (하한 적용)"""
+    return max(math.sqrt(var / weight) if weight > 0 else 0.0, floor)
+
+
+def _new_state(x: float, ts: float) -> Dict[str, float]:
+    return {
+        "n": 1, "mean": x, "var": 0.0, "w": 0.0, "t0": ts, "last": x, "ts": ts,
+        "rn": 0, "rmean": 0.0, "rvar": 0.0, "rw": 0.0, "rt0": None,
+    }
+
+
+# -----------------------------
+# 탐지기
+# -----------------------------
+class AnomalyDetector:
+    """기기별 스트리밍 이상 탐지기"""
+
+    def __init__(
+        self,
+        store=None,
+        *,
+        tau: float = BASELINE_TAU_SEC,
+        rate_tau: float = RATE_TAU_SEC,
+        warmup_sec: float = WARMUP_SEC,
+        z_threshold: float = Z_THRESHOLD,
+        rate_z_threshold: float = RATE_Z_THRESHOLD,
+    ) -> None:
+        self._store = store if store is not None else LocalStateStore()
+        self.tau = tau
+        self.rate_tau = rate_tau
+        self.warmup_sec = warmup_sec
+        self.z_threshold = z_threshold
+        self.rate_z_threshold = rate_z_threshold
+
+    def update(self, device_id: str, readings: Dict[str, Any], ts: float) -> Dict[str, Any]:
+        """
+        새 측정값을 직전 기준선으로 평가한 뒤 기준선을 갱신
+
+        Args:
+            device_id: 기기 ID
+            readings: {temperature, humidity, eco2, tvoc}
+            ts: 측정 시각 (epoch seconds)
+
+        Returns:
+            dict: {
+              score: 0~ANOMALY_MAX_BONUS,
+              factors: [str, ...],
+              z_scores: {sensor: float},
+              rate_z_scores: {sensor: float}
+            }
+        """
+        key = f"anomaly:{device_id}"
+        state: Dict[str, Dict[str, float]] = self._store.get(key) or {}
+
+        score = 0
+        factors = []
+        z_scores: Dict[str, float] = {}
+        rate_z_scores: Dict[str, float] = {}
+
+        for sensor, direction in ANOMALY_DIRECTIONS.items():
+            x = _to_float(readings.get(sensor))
+            if x is None:
+                continue
+            s = state.get(sensor)
+            if s is None or "t0" not in s:
+                state[sensor] = _new_state(x, ts)
+                continue
+
+            flagged = False
+
+            # --- 기준선 대비 편차 ---
+            std = _std(s["var"], s["w"], MIN_STD[sensor])
+            z = direction * (x - s["mean"]) / std
+            z_scores[sensor] = round(z, 2)
+            if self._warmed_up(s["t0"], s["n"], ts) and z >= self.z_threshold:
+                flagged = True
+                factors.append(
+                    f"{LABELS[sensor]} 기준선 이탈 ({x:.1f}{UNITS[sensor]}, 평소 {s['mean']:.1f}, z={z:.1f})"
+                )
+
+            # --- 변화율 (분당) ---
+            dt = ts - s["ts"]
+            if 0 < dt <= MAX_RATE_GAP_SEC:
+                rate = (x - s["last"]) * 60.0 / dt
+                if s["rt0"] is None:
+                    s["rt0"] = ts
+                rate_std = _std(s["rvar"], s["rw"], MIN_RATE_STD[sensor])
+                rz = direction * (rate - s["rmean"]) / rate_std
+                rate_z_scores[sensor] = round(rz, 2)
+                if self._warmed_up(s["rt0"], s["rn"], ts) and rz >= self.rate_z_threshold:
+                    if not flagged:
+                        factors.append(f"{LABELS[sensor]} 변화율 이상 ({rate:+.1f}{UNITS[sensor]}/분, z={rz:.1f})")
+                    flagged = True
+                rate_alpha = _time_alpha(dt, self.rate_tau)
+                s["rmean"], s["rvar"] = _ewma_update(s["rmean"], s["rvar"], rate, rate_alpha)
+                s["rw"] = _accumulate(s["rw"], rate_alpha)
+                s["rn"] += 1
+
+            if flagged:
+                score += ANOMALY_WEIGHTS[sensor]
+
+            # 이상값은 기준선에 약하게만 반영
+            alpha = _time_alpha(dt, self.tau)
+            if flagged:
+                alpha *= ANOMALY_ALPHA_FACTOR
+            s["mean"], s["var"] = _ewma_update(s["mean"], s["var"], x, alpha)
+            s["w"] = _accumulate(s["w"], alpha)
+            s["n"] += 1
+            s["last"] = x
+            s["ts"] = ts
+
+        self._store.set(key, state, ttl=STATE_TTL_SEC)
+
+        return {
+            "score": min(score, ANOMALY_MAX_BONUS),
+            "factors": factors,
+            "z_scores": z_scores,
+            "rate_z_scores": rate_z_scores,
+        }
+
+    def _warmed_up(self, started: float, samples: int, ts: float) -> bool:
+        return samples >= MIN_WARMUP_SAMPLES and ts - started >= self.warmup_sec
+
+    def reset(self, device_id: str) -> None:
+        """기기 기준선 초기화"""
+        self._store.delete(f"anomaly:{device_id}")
+
+
+__all__ = [
+    "AnomalyDetector",
+    "ANOMALY_DIRECTIONS",
+    "ANOMALY_WEIGHTS",
+    "ANOMALY_MAX_BONUS",
+]
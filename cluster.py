@@ -0,0 +1,186 @@
+"""
+멀티 워커 수평 확장 지원 모듈
+- 워커 간 Socket.IO 이벤트 팬아웃: Flask-SocketIO 메시지 큐(message_queue) 설정 제공
+  (구독 스레드는 Flask-SocketIO가 실제 서버 프로세스에서 첫 클라이언트 연결 시 시작)
+- 기기별 공유 상태 저장소 (알림 쿨다운, 트렌드 이력 등)
+- 백엔드: local(단일 프로세스/테스트용), redis(멀티 워커)
+- Redis 오류는 로그만 남기고 삼킴 (DB에 이미 저장된 수신 요청을 실패로 만들지 않도록)
+
+환경 변수:
+    CLUSTER_BACKEND=local|redis   (기본 local)
+    CLUSTER_REDIS_URL=redis://localhost:6379/0
+    CLUSTER_CHANNEL=fire_detector:events
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_CHANNEL = "fire_detector:events"
+DEFAULT_KEY_PREFIX = "fire_detector:"
+LOCAL_PURGE_EVERY = 1024  # 로컬 저장소: 이 횟수만큼 쓸 때마다 만료 키 정리
+
+
+# -----------------------------
+# 공유 상태 저장소 (기기별 상태)
+# -----------------------------
+class LocalStateStore:
+    """프로세스 메모리 상태 저장소 (TTL 지원, 만료 키는 주기적으로 정리)"""
+
+    def __init__(self) -> None:
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._after_write_locked()
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """키가 없을 때만 저장 (원자적). 저장했으면 True"""
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and (item[1] is None or item[1] > now):
+                return False
+            self._data[key] = (value, now + ttl if ttl else None)
+            self._after_write_locked()
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _after_write_locked(self) -> None:
+        self._writes += 1
+        if self._writes % LOCAL_PURGE_EVERY:
+            return
+        now = time.time()
+        expired = [k for k, (_, exp) in self._data.items() if exp is not None and exp <= now]
+        for k in expired:
+            del self._data[k]
+
+
+class RedisStateStore:
+    """
+    Redis 기반 공유 상태 저장소 - 값은 JSON으로 직렬화
+    - Redis 오류 시 로그 후 get은 default 반환, set/delete는 무시
+    - add는 SET NX PX로 원자적 선점 (오류 시 선점한 것으로 간주하여 처리를 막지 않음)
+    """
+
+    def __init__(self, url: str, prefix: str = DEFAULT_KEY_PREFIX) -> None:
+        import redis  # 선택 의존성: redis 백엔드 사용 시에만 필요
+
+        self._redis_error = redis.RedisError
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            raw = self._client.get(self._prefix + key)
+        except self._redis_error as e:
+            print(f"상태 저장소 조회 오류 ({key}): {e}")
+            return default
+        if raw is None:
+            return default
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raw = json.dumps(value, ensure_ascii=False)
+        try:
+            if ttl:
+                self._client.set(self._prefix + key, raw, px=int(ttl * 1000))
+            else:
+                self._client.set(self._prefix + key, raw)
+        except self._redis_error as e:
+            print(f"상태 저장소 저장 오류 ({key}): {e}")
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        raw = json.dumps(value, ensure_ascii=False)
+        try:
+            return bool(self._client.set(self._prefix + key, raw, nx=True, px=int(ttl * 1000) if ttl else None))
+        except self._redis_error as e:
+            print(f"상태 저장소 선점 오류 ({key}): {e}")
+            return True
+
+    def delete(self, key: str) -> None:
+        try:
+            self._client.delete(self._prefix + key)
+        except self._redis_error as e:
+            print(f"상태 저장소 삭제 오류 ({key}): {e}")
+
+
+# -----------------------------
+# 브로드캐스터
+# -----------------------------
+class Broadcaster:
+    """
+    Socket.IO 이벤트 전송
+    - redis 백엔드에서는 socketio가 메시지 큐를 거쳐 모든 워커의 클라이언트에게 전달
+    - 전송 실패는 로그만 남김 (실시간 전송 실패로 수신 요청을 실패시키지 않음)
+    """
+
+    def __init__(self, socketio) -> None:
+        self._socketio = socketio
+
+    def emit(self, event: str, data: Any) -> bool:
+        try:
+            self._socketio.emit(event, data)
+            return True
+        except Exception as e:
+            print(f"이벤트 발행 오류 ({event}): {e}")
+            return False
+
+
+# -----------------------------
+# 팩토리
+# -----------------------------
+def get_backend_name() -> str:
+    return os.getenv("CLUSTER_BACKEND", "local").lower()
+
+
+def socketio_queue_options() -> Dict[str, Any]:
+    """SocketIO(...)에 넘길 메시지 큐 옵션 (local이면 빈 dict → 단일 프로세스)"""
+    if get_backend_name() == "redis":
+        return {
+            "message_queue": os.getenv("CLUSTER_REDIS_URL", "redis://localhost:6379/0"),
+            "channel": os.getenv("CLUSTER_CHANNEL", DEFAULT_CHANNEL),
+        }
+    return {}
+
+
+def create_state_store():
+    """환경 변수에 맞는 상태 저장소 생성"""
+    if get_backend_name() == "redis":
+        return RedisStateStore(os.getenv("CLUSTER_REDIS_URL", "redis://localhost:6379/0"))
+    return LocalStateStore()
+
+
+__all__ = [
+    "LocalStateStore",
+    "RedisStateStore",
+    "Broadcaster",
+    "get_backend_name",
+    "socketio_queue_options",
+    "create_state_store",
+]
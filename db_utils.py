@@ -3,7 +3,7 @@ MySQL 데이터베이스 유틸리티 모듈
 """
 
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, DataError, IntegrityError
 import os
 from dotenv import load_dotenv
 
@@ -18,6 +18,7 @@ def get_db_connection():
             user=os.getenv('DB_USER', 'root'),
             password=os.getenv('DB_PASSWORD'),
             database=os.getenv('DB_NAME', 'sensor_db'),
+            connection_timeout=int(os.getenv('DB_CONNECT_TIMEOUT', 3)),
             autocommit=True
         )
         return connection
@@ -107,3 +108,60 @@ def insert_sensor_data(temperature, humidity, eco2, tvoc, device_id, timestamp,
         if connection.is_connected():
             cursor.close()
             connection.close()
+
+def insert_sensor_data_bulk(rows):
+    """
+    센서 데이터 여러 건을 한 번에 저장 (저널 재생용)
+    - rows: [{temperature, humidity, eco2, tvoc, device_id, timestamp, raw_data}, ...]
+    - created_at은 원래 수신 시각(timestamp)으로 기록
+    - 일괄 저장이 실패하면 한 건씩 저장
+      - 데이터 오류(DataError/IntegrityError) 행은 거부 목록에 넣고 계속 진행
+      - 연결 끊김 등 그 밖의 오류는 그 행에서 중단 (이후 행은 처리하지 않음)
+    - 반환: (앞에서부터 처리한 행 수, 거부된 행 인덱스 목록), 아무것도 저장하지 못한 DB 오류 시 None
+    """
+    connection = get_db_connection()
+    if not connection:
+        return None
+    
+    insert_query = """
+    INSERT INTO sensor_data (temperature, humidity, eco2, tvoc, device_id, timestamp, raw_data, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """
+    values = [(
+        row.get('temperature'), row.get('humidity'), row.get('eco2'), row.get('tvoc'),
+        row.get('device_id'), row.get('timestamp'), row.get('raw_data'), row.get('timestamp')
+    ) for row in rows]
+    
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        try:
+            cursor.executemany(insert_query, values)
+            return len(values), []
+        except Error as e:
+            if not connection.is_connected():
+                print(f"일괄 저장 중 연결 끊김: {e}")
+                return None
+            print(f"일괄 저장 오류, 개별 저장으로 전환: {e}")
+        
+        rejected = []
+        for i, value in enumerate(values):
+            try:
+                cursor.execute(insert_query, value)
+            except (DataError, IntegrityError) as e:
+                print(f"데이터 저장 오류 (거부): {e}")
+                rejected.append(i)
+            except Error as e:
+                print(f"개별 저장 중단 ({i}/{len(values)}건 처리): {e}")
+                return i, rejected
+        return len(values), rejected
+        
+    except Error as e:
+        print(f"일괄 저장 오류: {e}")
+        return None
+    
+    finally:
+        if connection.is_connected():
+            if cursor:
+                cursor.close()
+            connection.close()
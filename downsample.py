@@ -0,0 +1,93 @@
+"""
+시계열 다운샘플링 모듈
+Largest-Triangle-Three-Buckets(LTTB) 알고리즘으로 차트 표시용 포인트 수를 줄이면서
+화재 이벤트 같은 급격한 변화(스파이크)는 유지
+- 버킷 내 삼각형 넓이 계산은 numpy로 벡터화
+- NaN(결측값)은 계열별로 제외 후 다운샘플링
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    LTTB로 선택된 포인트의 인덱스 반환
+
+    Args:
+        x: 정렬된 x값 (예: epoch seconds)
+        y: y값 (x와 같은 길이, NaN 없음)
+        n_out: 출력 포인트 수 (3 이상)
+
+    Returns:
+        np.ndarray: 선택된 인덱스 (오름차순, 처음/마지막 포인트 포함)
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # 처음/마지막 포인트를 제외한 나머지를 n_out-2개 버킷으로 분할
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    # 다음 버킷 평균점 (마지막 버킷의 다음은 마지막 포인트) - 한 번에 계산
+    cx = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+    cy = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+    next_x = np.append(cx[1:], x[-1])
+    next_y = np.append(cy[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        # 삼각형 (A, 후보, 다음 버킷 평균점) 넓이의 2배 - 버킷 전체를 벡터 연산
+        areas = np.abs((ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay))
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample_series(
+    ts: np.ndarray,
+    columns: Dict[str, np.ndarray],
+    max_points: int,
+) -> Dict[str, List[List[float]]]:
+    """
+    여러 센서 계열을 각각 LTTB로 다운샘플링
+
+    Args:
+        ts: 정렬된 시각 배열 (epoch seconds)
+        columns: {계열명: 값 배열 (결측은 NaN)}
+        max_points: 계열당 최대 포인트 수
+
+    Returns:
+        dict: {계열명: [[epoch_ms, value], ...]}
+    """
+    result: Dict[str, List[List[float]]] = {}
+    for name, values in columns.items():
+        mask = ~np.isnan(values)
+        x, y = ts[mask], values[mask]
+        idx = lttb_indices(x, y, max_points)
+        result[name] = np.column_stack((x[idx] * 1000.0, y[idx])).tolist()
+    return result
+
+
+def rows_to_columns(rows: Sequence[Sequence], names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """DB 조회 결과(튜플 목록)를 열 단위 float 배열로 변환 (None/Decimal → NaN/float)"""
+    if not rows:
+        return {name: np.empty(0) for name in names}
+    matrix = np.array(rows, dtype=float)
+    return {name: matrix[:, i] for i, name in enumerate(names)}
+
+
+__all__ = [
+    "lttb_indices",
+    "downsample_series",
+    "rows_to_columns",
+]
@@ -5,13 +5,13 @@ ESP32 화재 감지 시스템
 - 가중치 기반 위험 점수(0~100)
 - 변화량(트렌드) 보정
 - 히스테리시스 및 알림 쿨다운 지원
+- 컴파일된 규칙 프로파일(RuleProfile) 기반 평가
 """
 
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional, Dict, Any
 import math
-import time
 
 
 # -----------------------------
@@ -42,6 +42,84 @@ DELTA_THRESHOLDS: Dict[str, float] = {
 DELTA_BONUS: int = 10  # 급상승 시 점수 가산치(요소당)
 
 
+@dataclass(frozen=True)
+class RuleProfile:
+    """
+    컴파일된 위험도 평가 규칙 (임계값·가중치를 평탄한 필드로 보관)
+    - 평가 시 dict 조회 없이 속성만 참조
+    - 응답에는 profile_id만 포함 (임계값 재직렬화 방지)
+    """
+    profile_id: str
+    temperature: float
+    tvoc: float
+    eco2: float
+    humidity_low: float
+    w_temperature: int
+    w_tvoc: int
+    w_eco2: int
+    w_humidity_low: int
+    d_temperature: float
+    d_tvoc: float
+    d_eco2: float
+    delta_bonus: int = DELTA_BONUS
+
+    @classmethod
+    def compile(
+        cls,
+        profile_id: str,
+        thresholds: Dict[str, float] = FIRE_THRESHOLDS,
+        weights: Dict[str, int] = FIRE_WEIGHTS,
+        delta_thresholds: Dict[str, float] = DELTA_THRESHOLDS,
+        delta_bonus: int = DELTA_BONUS,
+    ) -> "RuleProfile":
+        return cls(
+            profile_id=profile_id,
+            temperature=float(thresholds["temperature"]),
+            tvoc=float(thresholds["tvoc"]),
+            eco2=float(thresholds["eco2"]),
+            humidity_low=float(thresholds["humidity_low"]),
+            w_temperature=int(weights["temperature"]),
+            w_tvoc=int(weights["tvoc"]),
+            w_eco2=int(weights["eco2"]),
+            w_humidity_low=int(weights["humidity_low"]),
+            d_temperature=float(delta_thresholds["temperature"]),
+            d_tvoc=float(delta_thresholds["tvoc"]),
+            d_eco2=float(delta_thresholds["eco2"]),
+            delta_bonus=int(delta_bonus),
+        )
+
+    def thresholds(self) -> Dict[str, float]:
+        return {
+            "temperature": self.temperature,
+            "tvoc": self.tvoc,
+            "eco2": self.eco2,
+            "humidity_low": self.humidity_low,
+        }
+
+    def weights(self) -> Dict[str, int]:
+        return {
+            "temperature": self.w_temperature,
+            "tvoc": self.w_tvoc,
+            "eco2": self.w_eco2,
+            "humidity_low": self.w_humidity_low,
+        }
+
+    def delta_thresholds(self) -> Dict[str, float]:
+        return {"temperature": self.d_temperature, "tvoc": self.d_tvoc, "eco2": self.d_eco2}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "profile_id": self.profile_id,
+            "thresholds": self.thresholds(),
+            "weights": self.weights(),
+            "delta_thresholds": self.delta_thresholds(),
+            "delta_bonus": self.delta_bonus,
+        }
+
+
+DEFAULT_PROFILE = RuleProfile.compile("default")
+
+
 @dataclass
 class SensorReading:
     temperature: Optional[float]
@@ -76,8 +154,10 @@ def check_fire_risk(
     tvoc: Optional[float],
     *,
     prev: Optional[SensorReading] = None,
-    thresholds: Dict[str, float] = FIRE_THRESHOLDS,
-    weights: Dict[str, int] = FIRE_WEIGHTS,
+    anomaly: Optional[Dict[str, Any]] = None,
+    profile: RuleProfile = DEFAULT_PROFILE,
+    thresholds: Optional[Dict[str, float]] = None,
+    weights: Optional[Dict[str, int]] = None,
 ) -> Dict[str, Any]:
     """
     센서 데이터를 기반으로 화재 위험도를 평가
@@ -88,7 +168,9 @@ def check_fire_risk(
         eco2: ppm
         tvoc: ppb
         prev: 직전 센서값(트렌드 보정용). 없으면 보정 미적용
-        thresholds: 임계값 오버라이드
+        anomaly: 기기별 이상 탐지 결과(AnomalyDetector.update 반환값). 없으면 미적용
+        profile: 컴파일된 규칙 프로파일 (기본: 전역 임계값/가중치)
+        thresholds: 임계값 오버라이드 (지정 시 "custom" 프로파일로 컴파일)
         weights: 가중치 오버라이드 (합계 100 권장)
 
     Returns:
@@ -97,56 +179,65 @@ def check_fire_risk(
           risk_score: 0~100,
           message: str,
           risk_factors: [str, ...],
-          thresholds_used: dict,
+          profile_id: str,
           components: {temperature: 0|weight, ...},
-          delta_bonus: int
+          delta_bonus: int,
+          anomaly_bonus: int
         }
     """
-    risk_score = 0
+    if thresholds is not None or weights is not None:
+        profile = RuleProfile.compile(
+            "custom",
+            thresholds if thresholds is not None else profile.thresholds(),
+            weights if weights is not None else profile.weights(),
+            profile.delta_thresholds(),
+            profile.delta_bonus,
+        )
+
     risk_factors = []
-    components: Dict[str, int] = {"temperature": 0, "tvoc": 0, "eco2": 0, "humidity_low": 0}
+    c_temperature = c_tvoc = c_eco2 = c_humidity_low = 0
     delta_bonus_total = 0
 
     # --- 온도 ---
-    if _gt(temperature, thresholds["temperature"]):
-        risk_score += weights["temperature"]
-        components["temperature"] = weights["temperature"]
-        risk_factors.append(f"고온 감지 ({temperature:.2f}°C > {thresholds['temperature']}°C)")
+    if _gt(temperature, profile.temperature):
+        c_temperature = profile.w_temperature
+        risk_factors.append(f"고온 감지 ({temperature:.2f}°C > {profile.temperature}°C)")
     # --- TVOC ---
-    if _gt(tvoc, thresholds["tvoc"]):
-        risk_score += weights["tvoc"]
-        components["tvoc"] = weights["tvoc"]
-        risk_factors.append(f"TVOC 상승 ({tvoc:.0f}ppb > {thresholds['tvoc']}ppb)")
+    if _gt(tvoc, profile.tvoc):
+        c_tvoc = profile.w_tvoc
+        risk_factors.append(f"TVOC 상승 ({tvoc:.0f}ppb > {profile.tvoc}ppb)")
     # --- eCO2 ---
-    if _gt(eco2, thresholds["eco2"]):
-        risk_score += weights["eco2"]
-        components["eco2"] = weights["eco2"]
-        risk_factors.append(f"eCO2 상승 ({eco2:.0f}ppm > {thresholds['eco2']}ppm)")
+    if _gt(eco2, profile.eco2):
+        c_eco2 = profile.w_eco2
+        risk_factors.append(f"eCO2 상승 ({eco2:.0f}ppm > {profile.eco2}ppm)")
     # --- 낮은 습도 ---
-    if _lt(humidity, thresholds["humidity_low"]):
-        risk_score += weights["humidity_low"]
-        components["humidity_low"] = weights["humidity_low"]
-        risk_factors.append(f"낮은 습도 ({humidity:.1f}% < {thresholds['humidity_low']}%)")
+    if _lt(humidity, profile.humidity_low):
+        c_humidity_low = profile.w_humidity_low
+        risk_factors.append(f"낮은 습도 ({humidity:.1f}% < {profile.humidity_low}%)")
 
     # --- 트렌드(직전값 대비 급상승) 보정 ---
     if prev:
         if _is_valid(temperature) and _is_valid(prev.temperature):
-            if temperature - prev.temperature >= DELTA_THRESHOLDS["temperature"]:
-                risk_score += DELTA_BONUS
-                delta_bonus_total += DELTA_BONUS
+            if temperature - prev.temperature >= profile.d_temperature:
+                delta_bonus_total += profile.delta_bonus
                 risk_factors.append(f"온도 급상승 +{temperature - prev.temperature:.1f}°C")
         if _is_valid(tvoc) and _is_valid(prev.tvoc):
-            if tvoc - prev.tvoc >= DELTA_THRESHOLDS["tvoc"]:
-                risk_score += DELTA_BONUS
-                delta_bonus_total += DELTA_BONUS
+            if tvoc - prev.tvoc >= profile.d_tvoc:
+                delta_bonus_total += profile.delta_bonus
                 risk_factors.append(f"TVOC 급상승 +{tvoc - prev.tvoc:.0f}ppb")
         if _is_valid(eco2) and _is_valid(prev.eco2):
-            if eco2 - prev.eco2 >= DELTA_THRESHOLDS["eco2"]:
-                risk_score += DELTA_BONUS
-                delta_bonus_total += DELTA_BONUS
+            if eco2 - prev.eco2 >= profile.d_eco2:
+                delta_bonus_total += profile.delta_bonus
                 risk_factors.append(f"eCO2 급상승 +{eco2 - prev.eco2:.0f}ppm")
 
+    # --- 기기 기준선 대비 이상 탐지 보정 ---
+    anomaly_bonus = 0
+    if anomaly and anomaly.get("score"):
+        anomaly_bonus = int(anomaly["score"])
+        risk_factors.extend(anomaly.get("factors", []))
+
     # 점수 상한/하한
+    risk_score = c_temperature + c_tvoc + c_eco2 + c_humidity_low + delta_bonus_total + anomaly_bonus
     risk_score = max(0, min(100, risk_score))
 
     # 히스테리시스 규칙(너무 과민한 HIGH 방지):
@@ -154,13 +245,7 @@ def check_fire_risk(
     #           (b) 단일 요소라도 점수 70 이상(가중치+보정)일 때
     # - MEDIUM은 점수 40 이상
     # - LOW는 점수 20 이상
-    over_flags = {
-        "temperature": components["temperature"] > 0,
-        "tvoc": components["tvoc"] > 0,
-        "eco2": components["eco2"] > 0,
-        "humidity_low": components["humidity_low"] > 0,
-    }
-    two_strong = (over_flags["temperature"] and (over_flags["tvoc"] or over_flags["eco2"]))
+    two_strong = c_temperature > 0 and (c_tvoc > 0 or c_eco2 > 0)
 
     if two_strong or risk_score >= 70:
         risk_level = "HIGH"
@@ -180,9 +265,15 @@ def check_fire_risk(
         "risk_score": risk_score,
         "message": message,
         "risk_factors": risk_factors,
-        "thresholds_used": thresholds,
-        "components": components,
+        "profile_id": profile.profile_id,
+        "components": {
+            "temperature": c_temperature,
+            "tvoc": c_tvoc,
+            "eco2": c_eco2,
+            "humidity_low": c_humidity_low,
+        },
         "delta_bonus": delta_bonus_total,
+        "anomaly_bonus": anomaly_bonus,
     }
 
 
@@ -218,32 +309,16 @@ def is_fire_emergency(fire_risk: Dict[str, Any]) -> bool:
     return fire_risk.get("risk_level") == "HIGH"
 
 
-def should_send_alert(
-    fire_risk: Dict[str, Any],
-    *,
-    last_sent_ts: Optional[float] = None,
-    cooldown_sec: int = 60,
-) -> bool:
-    """
-    알림을 보내야 하는 상황인지 확인
-    - MEDIUM/HIGH에서만 발송
-    - 쿨다운 시간 내에는 중복 발송 방지
-    """
-    if fire_risk.get("risk_level") not in ("HIGH", "MEDIUM"):
-        return False
-    if last_sent_ts is None:
-        return True
-    return (time.time() - last_sent_ts) >= cooldown_sec
-
-
 __all__ = [
+    "RuleProfile",
+    "DEFAULT_PROFILE",
     "SensorReading",
     "FIRE_THRESHOLDS",
     "FIRE_WEIGHTS",
     "DELTA_THRESHOLDS",
+    "DELTA_BONUS",
     "check_fire_risk",
     "get_risk_level_color",
     "format_fire_alert",
     "is_fire_emergency",
-    "should_send_alert",
 ]
@@ -0,0 +1,211 @@
+"""
+수신 데이터 중복 제거(멱등 처리) 모듈
+ESP32 펌웨어가 타임아웃 시 POST /data를 재시도하므로,
+기기가 보낸 메시지 ID(msg_id) 또는 시퀀스 번호(seq)로 재전송을 식별
+- 공유 상태 저장소(cluster)에 원자적 선점(add)으로 기록 → 멀티 워커에서도 한 번만 저장
+- 처리 중(pending) 예약 중 도착한 재시도는 "pending"으로 구분 (호출 측은 재시도 가능한 오류로 응답)
+- 재부팅 구분: 기기가 보낸 boot_id를 키에 포함, 없으면 시퀀스가 크게 되돌아갈 때 epoch 증가
+  (이전 부팅의 시퀀스 키와 충돌하지 않음)
+- 시퀀스 번호 기준 누락(gap)·순서 역전(out-of-order)·재부팅(reset) 집계
+  (기기별 통계는 저장소에 읽기-수정-쓰기로 갱신하므로 멀티 워커에서는 근사값)
+- device_id는 클라이언트가 보내는 값이므로 기기 상태는 TTL로 만료, 워커별 기기 목록은 LRU로 제한
+
+환경 변수:
+    DEDUPE_TTL_SEC=600
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from cluster import LocalStateStore
+
+load_dotenv()
+
+DEDUPE_TTL_SEC: float = float(os.getenv("DEDUPE_TTL_SEC", 600))  # 확정된 메시지 키 보관 시간
+PENDING_TTL_SEC: float = 30.0  # 처리 중 예약 보관 시간 (워커가 죽어도 재시도가 막히지 않도록)
+REORDER_WINDOW: int = 64       # 이보다 크게 되돌아간 시퀀스는 재부팅으로 판단
+DEVICE_STATE_TTL_SEC: float = 24 * 3600.0  # 수신이 없는 기기의 시퀀스 상태/통계 보관 시간
+SEEN_DEVICES_MAX: int = 4096   # 전체 통계 조회용으로 기억하는 최근 기기 수 (워커별)
+
+PENDING = "__pending__"  # 최초 요청이 아직 처리 중임을 나타내는 표식
+
+NEW = "new"
+DUPLICATE = "duplicate"
+IN_FLIGHT = "pending"
+
+
+@dataclass
+class DeviceIngestState:
+    """기기별 시퀀스 상태 및 통계 (저장소에 dict로 보관)"""
+    highest_seq: Optional[int] = None
+    boot_id: Optional[str] = None
+    epoch: int = 0
+    accepted: int = 0
+    duplicates: int = 0
+    gaps: int = 0           # 누락된 것으로 확인된 시퀀스 수 (늦게 도착하면 차감)
+    out_of_order: int = 0   # 직전 최대값보다 작은 시퀀스로 도착한 횟수
+    resets: int = 0         # 재부팅(boot_id 변경 또는 시퀀스 초기화) 횟수
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "DeviceIngestState":
+        return cls(**data) if data else cls()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class IngestDeduplicator:
+    """
+    기기별 메시지 중복 제거기
+
+    사용법:
+        status, data_id, ticket = dedupe.begin(device_id, msg_id, seq, boot_id)
+        DUPLICATE → 최초 data_id로 응답 / IN_FLIGHT → 잠시 후 재시도 요청
+        저장 성공 → dedupe.commit(ticket, data_id)
+        저장 실패 → dedupe.abort(device_id, ticket)   (재시도 허용)
+    """
+
+    def __init__(
+        self,
+        store=None,
+        ttl: float = DEDUPE_TTL_SEC,
+        reorder_window: int = REORDER_WINDOW,
+        max_devices: int = SEEN_DEVICES_MAX,
+    ) -> None:
+        self._store = store if store is not None else LocalStateStore()
+        self.ttl = ttl
+        self.reorder_window = reorder_window
+        self.max_devices = max_devices
+        self._lock = threading.Lock()
+        self._seen: "OrderedDict[str, None]" = OrderedDict()  # 이 워커가 최근 본 기기 (LRU)
+
+    def _load(self, device_id: str) -> DeviceIngestState:
+        return DeviceIngestState.from_dict(self._store.get(f"ingest:{device_id}"))
+
+    def _save(self, device_id: str, state: DeviceIngestState) -> None:
+        self._store.set(f"ingest:{device_id}", state.to_dict(), ttl=DEVICE_STATE_TTL_SEC)
+
+    def begin(
+        self,
+        device_id: str,
+        msg_id: Optional[str] = None,
+        seq: Optional[int] = None,
+        boot_id: Optional[str] = None,
+    ) -> Tuple[str, Any, Optional[str]]:
+        """
+        메시지 처리 시작을 예약
+
+        Returns:
+            (status, data_id, ticket)
+            - (DUPLICATE, 최초 data_id, None): 이미 저장된 메시지
+            - (IN_FLIGHT, None, None): 최초 요청이 아직 처리 중 (재시도 필요)
+            - (NEW, None, ticket): 새 메시지 - ticket으로 commit/abort
+        """
+        boot_id = str(boot_id) if boot_id is not None else None
+        with self._lock:
+            self._seen[device_id] = None
+            self._seen.move_to_end(device_id)
+            if len(self._seen) > self.max_devices:
+                self._seen.popitem(last=False)
+            state = self._load(device_id)
+
+            reset = boot_id is not None and state.boot_id is not None and boot_id != state.boot_id
+            if (
+                not reset
+                and seq is not None
+                and state.highest_seq is not None
+                and seq < state.highest_seq - self.reorder_window
+            ):
+                reset = True
+            if reset:
+                state.epoch += 1
+                state.highest_seq = None
+                state.resets += 1
+            if boot_id is not None:
+                state.boot_id = boot_id
+
+            ticket = self._ticket(device_id, state, msg_id, seq)
+            if ticket is not None and not self._store.add(ticket, PENDING, ttl=PENDING_TTL_SEC):
+                data_id = self._store.get(ticket)
+                state = self._load(device_id)
+                state.duplicates += 1
+                self._save(device_id, state)
+                if data_id is None or data_id == PENDING:
+                    return IN_FLIGHT, None, None
+                return DUPLICATE, data_id, None
+
+            if seq is not None:
+                self._track_seq(state, seq)
+            state.accepted += 1
+            self._save(device_id, state)
+            return NEW, None, ticket
+
+    @staticmethod
+    def _ticket(device_id: str, state: DeviceIngestState, msg_id: Optional[str], seq: Optional[int]) -> Optional[str]:
+        boot = state.boot_id or ""
+        if msg_id is not None:
+            return f"dedupe:{device_id}:m:{boot}:{msg_id}"
+        if seq is not None:
+            return f"dedupe:{device_id}:s:{boot}:{state.epoch}:{seq}"
+        return None
+
+    @staticmethod
+    def _track_seq(state: DeviceIngestState, seq: int) -> None:
+        highest = state.highest_seq
+        if highest is None:
+            state.highest_seq = seq
+        elif seq > highest:
+            state.gaps += seq - highest - 1
+            state.highest_seq = seq
+        elif seq == highest:
+            # 저장 실패(abort) 후 같은 시퀀스 재시도
+            return
+        else:
+            # 앞서 누락으로 집계했던 시퀀스가 늦게 도착
+            state.out_of_order += 1
+            state.gaps = max(0, state.gaps - 1)
+
+    def commit(self, ticket: Optional[str], data_id: Any) -> None:
+        """처리 완료 - 예약을 최초 data_id로 확정"""
+        if ticket is not None:
+            self._store.set(ticket, data_id, ttl=self.ttl)
+
+    def abort(self, device_id: str, ticket: Optional[str]) -> None:
+        """처리 실패 - 예약을 해제하여 재시도가 다시 처리되도록 함"""
+        if ticket is None:
+            return
+        self._store.delete(ticket)
+        with self._lock:
+            state = self._load(device_id)
+            state.accepted = max(0, state.accepted - 1)
+            self._save(device_id, state)
+
+    def stats(self, device_id: Optional[str] = None) -> Dict[str, Any]:
+        """기기별 수신 통계 (device_id 생략 시 이 워커가 최근 본 기기만)"""
+        if device_id:
+            data = self._store.get(f"ingest:{device_id}")
+            return {device_id: DeviceIngestState.from_dict(data).to_dict()} if data else {}
+        with self._lock:
+            devices = sorted(self._seen)
+        result = {}
+        for d in devices:
+            data = self._store.get(f"ingest:{d}")
+            if data:
+                result[d] = DeviceIngestState.from_dict(data).to_dict()
+        return result
+
+
+__all__ = [
+    "DEDUPE_TTL_SEC",
+    "NEW",
+    "DUPLICATE",
+    "IN_FLIGHT",
+    "DeviceIngestState",
+    "IngestDeduplicator",
+]
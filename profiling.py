@@ -0,0 +1,231 @@
+"""
+요청 프로파일링 모듈 (선택 기능)
+- 설정한 비율의 요청만 cProfile로 감싸 라우트별로 누적
+- 지연 예산을 넘긴 요청은 단계별(DB·점수 계산·전송) 소요 시간과 함께 로그 출력
+- 둘 다 꺼져 있으면 훅과 stage()는 플래그 확인만 하고 바로 반환
+
+환경 변수:
+    PROFILE_SAMPLE_RATE=0.0          (0~1, 0이면 프로파일링 끔)
+    PROFILE_LATENCY_BUDGET_MS=0      (0이면 느린 요청 로그 끔)
+    PROFILE_ROUTES=/data             (쉼표 구분, 비우면 모든 라우트)
+    PROFILE_ADMIN_TOKEN=             (관리 엔드포인트 X-Admin-Token 헤더 값, 비우면 관리 엔드포인트 비활성)
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Optional
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+
+from dotenv import load_dotenv
+from flask import g, request
+
+load_dotenv()
+
+SORT_KEYS = frozenset(key.value for key in pstats.SortKey)  # text_report 정렬 기준
+
+
+class _NullStage:
+    """비활성 시 사용하는 빈 컨텍스트 매니저 (공유 인스턴스)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """단계 소요 시간 측정 (같은 단계가 여러 번이면 합산)"""
+
+    __slots__ = ("_stages", "_name", "_start")
+
+    def __init__(self, stages: Dict[str, float], name: str) -> None:
+        self._stages = stages
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = (time.perf_counter() - self._start) * 1000.0
+        self._stages[self._name] = self._stages.get(self._name, 0.0) + elapsed
+        return False
+
+
+class RequestProfiler:
+    """샘플링 기반 요청 프로파일러"""
+
+    def __init__(
+        self,
+        sample_rate: Optional[float] = None,
+        latency_budget_ms: Optional[float] = None,
+        routes: Optional[str] = None,
+    ) -> None:
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+        self.latency_budget_ms = (
+            latency_budget_ms if latency_budget_ms is not None else float(os.getenv("PROFILE_LATENCY_BUDGET_MS", 0))
+        )
+        routes = routes if routes is not None else os.getenv("PROFILE_ROUTES", "")
+        self.routes = {r.strip() for r in routes.split(",") if r.strip()}
+        self.admin_token = os.getenv("PROFILE_ADMIN_TOKEN") or None
+
+        self._lock = threading.Lock()
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._samples: Dict[str, int] = {}
+        self.slow_requests = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.latency_budget_ms > 0
+
+    # --- Flask 훅 ---
+    def init_app(self, app) -> None:
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    @staticmethod
+    def _route_key() -> str:
+        rule = request.url_rule.rule if request.url_rule else request.path
+        return f"{request.method} {rule}"
+
+    def _before_request(self) -> None:
+        if not self.enabled:
+            return
+        if self.routes and (request.url_rule is None or request.url_rule.rule not in self.routes):
+            return
+
+        g._profile_stages = {}
+        g._profile_start = time.perf_counter()
+
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # 다른 프로파일러가 이미 동작 중 (Python 3.12+ 스레드 간 단일 프로파일러)
+                return
+            g._profile = profile
+
+    def _teardown_request(self, exc=None) -> None:
+        if not self.enabled:
+            return
+        start = g.pop("_profile_start", None)
+        if start is None:
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        stages = g.pop("_profile_stages", {})
+        profile = g.pop("_profile", None)
+        key = self._route_key()
+
+        if profile is not None:
+            profile.disable()
+            with self._lock:
+                if key in self._stats:
+                    self._stats[key].add(profile)
+                else:
+                    self._stats[key] = pstats.Stats(profile)
+                self._samples[key] = self._samples.get(key, 0) + 1
+
+        if self.latency_budget_ms > 0 and elapsed_ms > self.latency_budget_ms:
+            self.slow_requests += 1
+            breakdown = ", ".join(f"{name}={ms:.1f}ms" for name, ms in stages.items())
+            other = elapsed_ms - sum(stages.values())
+            print(
+                f"🐢 느린 요청: {key} {elapsed_ms:.1f}ms > {self.latency_budget_ms:.0f}ms "
+                f"({breakdown + ', ' if breakdown else ''}기타={other:.1f}ms)"
+            )
+
+    # --- 단계 측정 ---
+    def stage(self, name: str):
+        """with profiler.stage('db'): ... 형태로 단계 소요 시간 기록"""
+        if not self.enabled:
+            return _NULL_STAGE
+        stages = g.get("_profile_stages")
+        if stages is None:
+            return _NULL_STAGE
+        return _Stage(stages, name)
+
+    # --- 결과 조회 ---
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = dict(self._samples)
+        return {
+            "sample_rate": self.sample_rate,
+            "latency_budget_ms": self.latency_budget_ms,
+            "routes_filter": sorted(self.routes),
+            "slow_requests": self.slow_requests,
+            "profiled_routes": samples,
+        }
+
+    def _copy_stats(self, key: str) -> Optional[pstats.Stats]:
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                return None
+            copied = pstats.Stats()
+            copied.add(stats)
+        return copied
+
+    def pstats_dump(self, key: str) -> Optional[bytes]:
+        """pstats 바이너리 (python -m pstats / snakeviz 등으로 열기)"""
+        stats = self._copy_stats(key)
+        return marshal.dumps(stats.stats) if stats else None
+
+    def text_report(self, key: str, sort: str = "cumulative", limit: int = 40) -> Optional[str]:
+        if sort not in SORT_KEYS:
+            raise ValueError(f"지원하지 않는 정렬 기준: {sort}")
+        stats = self._copy_stats(key)
+        if stats is None:
+            return None
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def collapsed(self, key: str) -> Optional[str]:
+        """
+        collapsed-stack 형식 (flamegraph.pl / speedscope 입력)
+        cProfile은 전체 스택이 아닌 호출자→피호출자 관계만 기록하므로
+        "호출자;피호출자 자체시간(us)" 2단계 스택으로 출력
+        """
+        stats = self._copy_stats(key)
+        if stats is None:
+            return None
+
+        def label(func) -> str:
+            filename, line, name = func
+            return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ":")
+
+        lines = []
+        for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+            if not callers:
+                if tt > 0:
+                    lines.append(f"{label(func)} {int(tt * 1e6)}")
+                continue
+            for caller, caller_stats in callers.items():
+                caller_tt = caller_stats[2] if isinstance(caller_stats, tuple) else tt
+                if caller_tt > 0:
+                    lines.append(f"{label(caller)};{label(func)} {int(caller_tt * 1e6)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._samples.clear()
+        self.slow_requests = 0
+
+
+__all__ = [
+    "RequestProfiler",
+    "SORT_KEYS",
+]
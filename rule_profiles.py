@@ -0,0 +1,260 @@
+"""
+기기/그룹별 화재 감지 규칙 프로파일 모듈
+- JSON 설정 파일에서 프로파일 로드 및 검증
+- 검증된 프로파일은 RuleProfile 객체로 한 번만 컴파일
+- 설정 파일 변경 시 재시작 없이 자동 재로드 (검증 실패 시 기존 설정 유지)
+
+설정 파일 형식 (RULE_PROFILES_PATH, 기본은 이 모듈과 같은 디렉터리의 rule_profiles.json):
+    {
+      "default_profile": "default",
+      "profiles": {
+        "default": {},
+        "kitchen": {"thresholds": {"temperature": 45.0}, "weights": {...}}
+      },
+      "groups": {"kitchen": ["esp32_kitchen_*"]},
+      "devices": {"esp32_fire_detector_01": "default"}
+    }
+    - 프로파일에서 생략한 값은 fire_detector의 전역 기본값 사용
+    - 기기 매핑 우선순위: devices(정확히 일치) > groups(패턴) > default_profile
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from fire_detector import (
+    RuleProfile,
+    DEFAULT_PROFILE,
+    FIRE_THRESHOLDS,
+    FIRE_WEIGHTS,
+    DELTA_THRESHOLDS,
+    DELTA_BONUS,
+)
+
+load_dotenv()
+
+RELOAD_CHECK_INTERVAL_SEC = 2.0  # 설정 파일 변경 확인 주기
+DEVICE_CACHE_SIZE = 4096         # 그룹 패턴 매칭 결과 캐시 최대 기기 수 (LRU)
+DEFAULT_PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rule_profiles.json")
+
+
+class RuleProfileError(ValueError):
+    """규칙 프로파일 설정 검증 오류"""
+
+
+# -----------------------------
+# 검증 & 컴파일
+# -----------------------------
+def _merge_section(
+    profile_id: str,
+    section: str,
+    overrides: Any,
+    defaults: Dict[str, Any],
+    *,
+    integer: bool = False,
+) -> Dict[str, Any]:
+    if overrides is None:
+        return dict(defaults)
+    if not isinstance(overrides, dict):
+        raise RuleProfileError(f"프로파일 '{profile_id}'의 {section}는 객체여야 합니다")
+
+    merged = dict(defaults)
+    for key, value in overrides.items():
+        if key not in defaults:
+            raise RuleProfileError(f"프로파일 '{profile_id}'의 {section}에 알 수 없는 항목: {key}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise RuleProfileError(f"프로파일 '{profile_id}'의 {section}.{key}는 숫자여야 합니다")
+        if value < 0:
+            raise RuleProfileError(f"프로파일 '{profile_id}'의 {section}.{key}는 0 이상이어야 합니다")
+        if integer and int(value) != value:
+            raise RuleProfileError(f"프로파일 '{profile_id}'의 {section}.{key}는 정수여야 합니다")
+        merged[key] = value
+    return merged
+
+
+def compile_profile(profile_id: str, spec: Any) -> RuleProfile:
+    """프로파일 설정 하나를 검증 후 RuleProfile로 컴파일"""
+    if not isinstance(spec, dict):
+        raise RuleProfileError(f"프로파일 '{profile_id}'는 객체여야 합니다")
+
+    unknown = set(spec) - {"thresholds", "weights", "delta_thresholds", "delta_bonus", "description"}
+    if unknown:
+        raise RuleProfileError(f"프로파일 '{profile_id}'에 알 수 없는 항목: {', '.join(sorted(unknown))}")
+
+    delta_bonus = spec.get("delta_bonus", DELTA_BONUS)
+    if isinstance(delta_bonus, bool) or not isinstance(delta_bonus, int) or delta_bonus < 0:
+        raise RuleProfileError(f"프로파일 '{profile_id}'의 delta_bonus는 0 이상의 정수여야 합니다")
+
+    return RuleProfile.compile(
+        profile_id,
+        _merge_section(profile_id, "thresholds", spec.get("thresholds"), FIRE_THRESHOLDS),
+        _merge_section(profile_id, "weights", spec.get("weights"), FIRE_WEIGHTS, integer=True),
+        _merge_section(profile_id, "delta_thresholds", spec.get("delta_thresholds"), DELTA_THRESHOLDS),
+        delta_bonus,
+    )
+
+
+def compile_config(config: Any) -> Tuple[Dict[str, RuleProfile], RuleProfile, Dict[str, RuleProfile], List[Tuple[str, RuleProfile]]]:
+    """
+    설정 전체를 검증 후 컴파일
+
+    Returns:
+        (profiles, default_profile, device_map, group_patterns)
+    """
+    if not isinstance(config, dict):
+        raise RuleProfileError("설정 최상위는 객체여야 합니다")
+
+    raw_profiles = config.get("profiles", {})
+    if not isinstance(raw_profiles, dict):
+        raise RuleProfileError("profiles는 객체여야 합니다")
+
+    profiles = {pid: compile_profile(pid, spec) for pid, spec in raw_profiles.items()}
+    profiles.setdefault(DEFAULT_PROFILE.profile_id, DEFAULT_PROFILE)
+
+    default_id = config.get("default_profile", DEFAULT_PROFILE.profile_id)
+    if default_id not in profiles:
+        raise RuleProfileError(f"default_profile '{default_id}'가 정의되지 않았습니다")
+
+    devices = config.get("devices", {})
+    if not isinstance(devices, dict):
+        raise RuleProfileError("devices는 객체여야 합니다")
+    device_map: Dict[str, RuleProfile] = {}
+    for device_id, pid in devices.items():
+        if pid not in profiles:
+            raise RuleProfileError(f"기기 '{device_id}'의 프로파일 '{pid}'가 정의되지 않았습니다")
+        device_map[device_id] = profiles[pid]
+
+    groups = config.get("groups", {})
+    if not isinstance(groups, dict):
+        raise RuleProfileError("groups는 객체여야 합니다")
+    group_patterns: List[Tuple[str, RuleProfile]] = []
+    for pid, patterns in groups.items():
+        if pid not in profiles:
+            raise RuleProfileError(f"그룹 프로파일 '{pid}'가 정의되지 않았습니다")
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+            raise RuleProfileError(f"그룹 '{pid}'의 패턴은 문자열 목록이어야 합니다")
+        group_patterns.extend((p, profiles[pid]) for p in patterns)
+
+    return profiles, profiles[default_id], device_map, group_patterns
+
+
+# -----------------------------
+# 레지스트리 (핫 리로드)
+# -----------------------------
+class RuleProfileRegistry:
+    """
+    기기 ID → 컴파일된 RuleProfile 조회
+    - 그룹 패턴 매칭 결과는 크기 제한 LRU로 캐시 (재로드 시 초기화)
+    - 조회 시 주기적으로 설정 파일 mtime을 확인해 변경되면 재로드
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        check_interval: float = RELOAD_CHECK_INTERVAL_SEC,
+        cache_size: int = DEVICE_CACHE_SIZE,
+    ) -> None:
+        self.path = path or os.getenv("RULE_PROFILES_PATH") or DEFAULT_PROFILES_PATH
+        self.check_interval = check_interval
+        self.cache_size = cache_size
+        self._missing_logged = False
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._profiles: Dict[str, RuleProfile] = {DEFAULT_PROFILE.profile_id: DEFAULT_PROFILE}
+        self._default = DEFAULT_PROFILE
+        self._device_map: Dict[str, RuleProfile] = {}
+        self._group_patterns: List[Tuple[str, RuleProfile]] = []
+        self._cache: "OrderedDict[str, RuleProfile]" = OrderedDict()
+        self.reload_if_changed(force=True)
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """설정 파일이 바뀌었으면 재로드. 재로드 성공 시 True"""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+        self._next_check = now + self.check_interval
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as e:
+            # 파일이 없으면 한 번만 로그 (기본/기존 설정 유지)
+            if not self._missing_logged:
+                self._missing_logged = True
+                print(f"규칙 프로파일 파일을 찾을 수 없음, '{self._default.profile_id}' 프로파일 유지 ({self.path}): {e}")
+            return False
+        self._missing_logged = False
+        if not force and mtime == self._mtime:
+            return False
+
+        with self._lock:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    compiled = compile_config(json.load(f))
+            except (OSError, ValueError) as e:
+                # JSON 오류/검증 오류 모두 기존 설정 유지
+                print(f"규칙 프로파일 로드 오류 ({self.path}): {e}")
+                self._mtime = mtime
+                return False
+
+            self._profiles, self._default, self._device_map, self._group_patterns = compiled
+            self._cache = OrderedDict()
+            self._mtime = mtime
+
+        print(f"규칙 프로파일 로드 완료: {', '.join(sorted(self._profiles))} ({self.path})")
+        return True
+
+    def for_device(self, device_id: Optional[str]) -> RuleProfile:
+        """기기에 적용할 프로파일 반환"""
+        self.reload_if_changed()
+        if not device_id:
+            return self._default
+
+        profile = self._device_map.get(device_id)
+        if profile is not None:
+            return profile
+
+        with self._lock:
+            profile = self._cache.get(device_id)
+            if profile is not None:
+                self._cache.move_to_end(device_id)
+                return profile
+
+        profile = next(
+            (p for pattern, p in self._group_patterns if fnmatchcase(device_id, pattern)),
+            self._default,
+        )
+        with self._lock:
+            self._cache[device_id] = profile
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return profile
+
+    def get(self, profile_id: str) -> Optional[RuleProfile]:
+        self.reload_if_changed()
+        return self._profiles.get(profile_id)
+
+    def all(self) -> Dict[str, RuleProfile]:
+        self.reload_if_changed()
+        return dict(self._profiles)
+
+    @property
+    def default_profile_id(self) -> str:
+        return self._default.profile_id
+
+
+__all__ = [
+    "RuleProfileError",
+    "RuleProfileRegistry",
+    "compile_profile",
+    "compile_config",
+]
@@ -7,12 +7,42 @@ from mysql.connector import Error
 from decimal import Decimal
 
 # 우리가 만든 모듈들 import
-from fire_detector import check_fire_risk, format_fire_alert, FIRE_THRESHOLDS
-from db_utils import get_db_connection, get_data_count, get_latest_sensor_data, insert_sensor_data
+from fire_detector import check_fire_risk, format_fire_alert, SensorReading, FIRE_THRESHOLDS
+from db_utils import get_db_connection, get_data_count, get_latest_sensor_data, insert_sensor_data, insert_sensor_data_bulk
+from cluster import Broadcaster, create_state_store, get_backend_name, socketio_queue_options
+from anomaly_detector import AnomalyDetector
+from rule_profiles import RuleProfileRegistry
+from ingest_dedupe import IngestDeduplicator, DUPLICATE, IN_FLIGHT
+from spill_journal import DatabaseGate, SpillJournal, JournalReplayer
+from downsample import downsample_series, rows_to_columns
+from profiling import RequestProfiler, SORT_KEYS
+from alert_dispatcher import AlertDispatcher, create_sinks
 
 app = Flask(__name__)
 CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*")
+# redis 백엔드면 Flask-SocketIO 메시지 큐로 모든 워커에 이벤트 팬아웃
+socketio = SocketIO(app, cors_allowed_origins="*", **socketio_queue_options())
+
+# 선택 기능: 샘플링 프로파일링 및 느린 요청 로그 (PROFILE_* 환경 변수)
+profiler = RequestProfiler()
+profiler.init_app(app)
+
+# 멀티 워커 지원: 이벤트는 메시지 큐로 팬아웃, 기기별 상태는 공유 저장소에 보관
+broadcaster = Broadcaster(socketio)
+state_store = create_state_store()
+anomaly_detector = AnomalyDetector(state_store)
+rule_profiles = RuleProfileRegistry()
+ingest_dedupe = IngestDeduplicator(state_store)
+
+# 화재 알림: 기기별 쿨다운/격상 판단 후 워커 풀에서 비동기 발송
+alert_dispatcher = AlertDispatcher(create_sinks(broadcaster), state_store)
+
+# MySQL 장애 시 로컬 저널에 기록 후 복구되면 일괄 반영
+db_gate = DatabaseGate()
+spill_journal = SpillJournal()
+journal_replayer = JournalReplayer(spill_journal, insert_sensor_data_bulk, db_gate)
+
+TREND_STATE_TTL_SEC = 600  # 이 시간보다 오래된 직전값은 트렌드 보정에 사용하지 않음
 
 def convert_decimal(obj):
     """Decimal 타입을 JSON 직렬화 가능한 타입으로 변환"""
@@ -24,6 +54,17 @@ def convert_decimal(obj):
         return [convert_decimal(v) for v in obj]
     return obj
 
+SERIES_FIELDS = ('temperature', 'humidity', 'eco2', 'tvoc')
+
+def parse_time_param(value):
+    """시간 파라미터 파싱 (epoch seconds 또는 'YYYY-MM-DD HH:MM:SS'/ISO 형식)"""
+    if value is None:
+        return None
+    try:
+        return datetime.fromtimestamp(float(value))
+    except ValueError:
+        return datetime.fromisoformat(value)
+
 @app.route("/dashboard", methods=["GET"])
 def dashboard():
     """Vue.js 대시보드로 리다이렉트"""
@@ -50,10 +91,14 @@ def home():
     <p>API 엔드포인트:</p>
     <ul>
         <li>POST /data - 센서 데이터 전송 (실시간 WebSocket 브로드캐스트)</li>
-        <li>GET /data - 모든 데이터 조회</li>
+        <li>GET /data - 모든 데이터 조회 (from/to/max_points 지정 시 LTTB 다운샘플링)</li>
         <li>GET /latest - 최신 데이터 조회</li>
         <li>GET /stats - 데이터 통계</li>
         <li><strong>GET /fire-check - 화재 위험도 체크</strong></li>
+        <li>GET /profiles - 규칙 프로파일 조회</li>
+        <li>GET /ingest/stats - 기기별 수신 통계 (중복·누락·순서 역전)</li>
+        <li>GET /journal/stats - DB 장애 대비 로컬 저널 상태</li>
+        <li>GET /alerts/stats - 화재 알림 발송 통계</li>
         <li>POST /clear - 모든 데이터 삭제</li>
     </ul>
     <p>🔥 화재 감지 임계값:</p>
@@ -69,6 +114,7 @@ def home():
 @app.route('/data', methods=['POST'])
 def receive_data():
     """센서 데이터 받기 - MySQL 저장 + 실시간 WebSocket 전송"""
+    dedupe_ticket = None
     try:
         # JSON 데이터 받기
         data = request.get_json()
@@ -90,21 +136,100 @@ def receive_data():
         tvoc = data.get('tvoc')
         device_id = data.get('device_id') or 'esp32_fire_detector_01'
         
-        # 데이터베이스에 저장
-        data_id = insert_sensor_data(
-            temperature, humidity, eco2, tvoc, device_id, 
-            timestamp, json.dumps(data, ensure_ascii=False)
-        )
-        
-        if not data_id:
+        # 재전송 식별 (선택): 메시지 ID 또는 시퀀스 번호 (+ 부팅 ID)
+        msg_id = data.get('msg_id')
+        boot_id = data.get('boot_id')
+        seq = data.get('seq')
+        if seq is not None:
+            try:
+                seq = int(seq)
+            except (TypeError, ValueError):
+                return jsonify({
+                    "status": "error",
+                    "message": "seq는 정수여야 합니다"
+                }), 400
+        
+        dedupe_status, original_id, dedupe_ticket = ingest_dedupe.begin(device_id, msg_id, seq, boot_id)
+        if dedupe_status == DUPLICATE:
+            # 재전송 → 저장/브로드캐스트/알림 없이 최초 data_id로 응답
             return jsonify({
-                "status": "error",
-                "message": "데이터베이스 저장 실패"
-            }), 500
-        
-        # 화재 위험도 체크
-        fire_risk = check_fire_risk(temperature, humidity, eco2, tvoc)
-        alert_message = format_fire_alert(fire_risk, device_id)
+                "status": "duplicate",
+                "message": "이미 수신된 데이터입니다",
+                "data_id": original_id,
+                "duplicate": True
+            }), 200
+        if dedupe_status == IN_FLIGHT:
+            # 최초 요청이 아직 처리 중 → 실패할 수 있으므로 재시도하도록 응답
+            return jsonify({
+                "status": "pending",
+                "message": "동일한 데이터를 처리 중입니다. 잠시 후 다시 전송하세요",
+                "retryable": True
+            }), 409, {"Retry-After": "1"}
+        
+        # 데이터베이스에 저장 (DB 장애 중에는 연결 시도 없이 바로 저널로, 시간 예산 초과 시에도 저널로)
+        raw_data = json.dumps(data, ensure_ascii=False)
+        data_id = None
+        late_insert = None
+        with profiler.stage('db'):
+            if db_gate.available():
+                data_id, late_insert = db_gate.run(
+                    insert_sensor_data,
+                    temperature, humidity, eco2, tvoc, device_id, 
+                    timestamp, raw_data
+                )
+                if data_id:
+                    db_gate.record_success()
+                else:
+                    db_gate.record_failure()
+        
+        journal_ref = None
+        with profiler.stage('journal'):
+            if not data_id:
+                try:
+                    journal_ref = spill_journal.append({
+                        "temperature": temperature,
+                        "humidity": humidity,
+                        "eco2": eco2,
+                        "tvoc": tvoc,
+                        "device_id": device_id,
+                        "timestamp": data['timestamp'],
+                        "raw_data": raw_data
+                    }, inflight=late_insert)
+                except OSError as e:
+                    print(f"저널 기록 오류: {e}")
+                    ingest_dedupe.abort(device_id, dedupe_ticket)
+                    return jsonify({
+                        "status": "error",
+                        "message": "데이터베이스 저장 실패"
+                    }), 500
+        if journal_ref or spill_journal.has_backlog():
+            # 재생기는 저널에 기록이 생기면 시작 (gunicorn 워커 포함 실제 요청 처리 프로세스에서만)
+            journal_replayer.start()
+        ingest_dedupe.commit(dedupe_ticket, data_id or journal_ref)
+        dedupe_ticket = None  # 저장 확정 → 이후 단계 오류로 예약을 해제하지 않음
+        
+        # 화재 위험도 체크 (공유 저장소의 직전값으로 트렌드 보정)
+        with profiler.stage('scoring'):
+            prev_state = state_store.get(f"trend:{device_id}")
+            prev = SensorReading(**prev_state) if prev_state else None
+            anomaly = anomaly_detector.update(device_id, {
+                "temperature": temperature,
+                "humidity": humidity,
+                "eco2": eco2,
+                "tvoc": tvoc
+            }, timestamp.timestamp())
+            fire_risk = check_fire_risk(
+                temperature, humidity, eco2, tvoc,
+                prev=prev, anomaly=anomaly, profile=rule_profiles.for_device(device_id)
+            )
+            state_store.set(f"trend:{device_id}", {
+                "temperature": temperature,
+                "humidity": humidity,
+                "eco2": eco2,
+                "tvoc": tvoc,
+                "ts": timestamp.timestamp()
+            }, ttl=TREND_STATE_TTL_SEC)
+            alert_message = format_fire_alert(fire_risk, device_id)
         
         # 실시간 데이터 준비 (Decimal 변환 포함)
         realtime_data = convert_decimal({
@@ -119,20 +244,16 @@ def receive_data():
             "alert_message": alert_message
         })
         
-        # 🚀 실시간 WebSocket으로 모든 연결된 클라이언트에게 데이터 전송
-        socketio.emit('sensor_data', realtime_data)
+        # 🚀 실시간 WebSocket으로 모든 워커의 연결된 클라이언트에게 데이터 전송
+        with profiler.stage('emit'):
+            broadcast_ok = broadcaster.emit('sensor_data', realtime_data)
         
-        # 화재 위험 상황이면 별도 알림
-        if fire_risk.get('level') in ['HIGH', 'CRITICAL']:
-            socketio.emit('fire_alert', convert_decimal({
-                "level": fire_risk.get('level'),
-                "message": alert_message,
-                "data": realtime_data
-            }))
+            # 화재 위험 상황이면 별도 알림 (쿨다운/격상 판단 후 큐에 넣기만 하고 발송은 워커에서)
+            alert_status = alert_dispatcher.submit(device_id, fire_risk, alert_message, realtime_data)
         
         # 콘솔에 출력
         print("=" * 50)
-        print(f"📡 실시간 전송 완료! 새로운 센서 데이터 수신 (ID: {data_id}): {data['timestamp']}")
+        print(f"📡 실시간 전송 완료! 새로운 센서 데이터 수신 (ID: {data_id or journal_ref}): {data['timestamp']}")
         print(f"기기 ID: {device_id}")
         print(f"온도: {temperature}°C, 습도: {humidity}%")
         print(f"eCO2: {eco2}ppm, TVOC: {tvoc}ppb")
@@ -140,17 +261,32 @@ def receive_data():
         print(alert_message)
         print("=" * 50)
         
+        if journal_ref:
+            return jsonify({
+                "status": "spooled",
+                "message": "데이터베이스 장애로 로컬 저널에 저장되었습니다 (복구 후 자동 반영)",
+                "data_id": None,
+                "journal_ref": journal_ref,
+                "received_data": data,
+                "fire_risk_analysis": fire_risk,
+                "alert_status": alert_status,
+                "realtime_broadcast": broadcast_ok
+            }), 202
+        
         return jsonify({
             "status": "success", 
             "message": "데이터가 성공적으로 저장되고 실시간 전송되었습니다",
             "data_id": data_id,
             "received_data": data,
             "fire_risk_analysis": fire_risk,
-            "realtime_broadcast": True
+            "alert_status": alert_status,
+            "realtime_broadcast": broadcast_ok
         }), 200
         
     except Exception as e:
         print(f"오류 발생: {e}")
+        if dedupe_ticket:
+            ingest_dedupe.abort(device_id, dedupe_ticket)
         return jsonify({
             "status": "error", 
             "message": str(e)
@@ -177,7 +313,8 @@ def handle_connect(auth):
                 float(latest_data.get('temperature')) if latest_data.get('temperature') else 0,
                 float(latest_data.get('humidity')) if latest_data.get('humidity') else 0,
                 int(latest_data.get('eco2')) if latest_data.get('eco2') else 0,
-                int(latest_data.get('tvoc')) if latest_data.get('tvoc') else 0
+                int(latest_data.get('tvoc')) if latest_data.get('tvoc') else 0,
+                profile=rule_profiles.for_device(latest_data.get('device_id'))
             ) if latest_data.get('temperature') else None
         })
         emit('sensor_data', converted_data)
@@ -203,7 +340,8 @@ def fire_check():
         latest_data['temperature'],
         latest_data['humidity'], 
         latest_data['eco2'],
-        latest_data['tvoc']
+        latest_data['tvoc'],
+        profile=rule_profiles.for_device(latest_data.get('device_id'))
     )
     
     return jsonify({
@@ -211,9 +349,120 @@ def fire_check():
         "fire_risk_analysis": fire_risk
     })
 
+@app.route('/ingest/stats', methods=['GET'])
+def get_ingest_stats():
+    """기기별 수신 통계 (중복·누락·순서 역전)"""
+    device_id = request.args.get('device_id')
+    return jsonify({
+        "device_filter": device_id,
+        "devices": ingest_dedupe.stats(device_id)
+    })
+
+@app.route('/alerts/stats', methods=['GET'])
+def get_alert_stats():
+    """알림 발송 통계 (발송·억제·실패·유실)"""
+    return jsonify(alert_dispatcher.stats())
+
+@app.route('/journal/stats', methods=['GET'])
+def get_journal_stats():
+    """로컬 스필 저널 상태 (크기·지연·재생 처리량)"""
+    return jsonify(journal_replayer.stats())
+
+@app.route('/admin/profile', methods=['GET', 'DELETE'])
+def admin_profile():
+    """
+    라우트별 누적 프로파일 조회
+    - 파라미터 없음: 프로파일링 설정 및 라우트별 샘플 수
+    - route=POST /data&format=text|pstats|collapsed: 해당 라우트 결과
+    - DELETE: 누적 결과 초기화
+    - 프로파일링이 꺼져 있거나 PROFILE_ADMIN_TOKEN이 없으면 404
+    """
+    if not profiler.enabled or not profiler.admin_token:
+        return jsonify({
+            "status": "error",
+            "message": "프로파일링이 비활성화되어 있습니다"
+        }), 404
+    if request.headers.get('X-Admin-Token') != profiler.admin_token:
+        return jsonify({
+            "status": "error",
+            "message": "인증 실패"
+        }), 403
+    
+    if request.method == 'DELETE':
+        profiler.reset()
+        return jsonify({
+            "status": "success",
+            "message": "프로파일 결과가 초기화되었습니다"
+        })
+    
+    route = request.args.get('route')
+    if not route:
+        return jsonify(profiler.summary())
+    
+    fmt = request.args.get('format', 'text')
+    if fmt == 'pstats':
+        body = profiler.pstats_dump(route)
+        mimetype = 'application/octet-stream'
+    elif fmt == 'collapsed':
+        body = profiler.collapsed(route)
+        mimetype = 'text/plain'
+    elif fmt == 'text':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in SORT_KEYS:
+            return jsonify({
+                "status": "error",
+                "message": f"sort는 {', '.join(sorted(SORT_KEYS))} 중 하나여야 합니다"
+            }), 400
+        body = profiler.text_report(route, sort=sort)
+        mimetype = 'text/plain'
+    else:
+        return jsonify({
+            "status": "error",
+            "message": "format은 text, pstats, collapsed 중 하나여야 합니다"
+        }), 400
+    
+    if body is None:
+        return jsonify({
+            "status": "error",
+            "message": f"프로파일 결과가 없습니다: {route}"
+        }), 404
+    return app.response_class(body, mimetype=mimetype)
+
+@app.route('/profiles', methods=['GET'])
+def get_profiles():
+    """규칙 프로파일 목록 조회 (device_id 지정 시 적용 프로파일 포함)"""
+    device_id = request.args.get('device_id')
+    result = {
+        "default_profile": rule_profiles.default_profile_id,
+        "profiles": {pid: p.to_dict() for pid, p in rule_profiles.all().items()}
+    }
+    if device_id:
+        result["device_id"] = device_id
+        result["device_profile"] = rule_profiles.for_device(device_id).profile_id
+    return jsonify(result)
+
+@app.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """규칙 프로파일 상세 조회 (응답의 profile_id로 임계값 확인)"""
+    profile = rule_profiles.get(profile_id)
+    if not profile:
+        return jsonify({
+            "status": "error",
+            "message": f"프로파일을 찾을 수 없습니다: {profile_id}"
+        }), 404
+    return jsonify(profile.to_dict())
+
 @app.route('/data', methods=['GET'])
 def get_all_data():
-    """모든 센서 데이터 조회"""
+    """모든 센서 데이터 조회 (from/to 지정 시 시간 범위 계열 조회)"""
+    if request.args.get('from') or request.args.get('to'):
+        return get_range_data()
+    if 'max_points' in request.args:
+        return jsonify({
+            "status": "error",
+            "message": "max_points는 from/to와 함께 사용해야 합니다"
+        }), 400
+    
     connection = get_db_connection()
     if not connection:
         return jsonify({
@@ -234,27 +483,29 @@ def get_all_data():
         
         # 전체 데이터 수 조회
         count_query = "SELECT COUNT(*) as total FROM sensor_data"
-        if device_id:
-            count_query += " WHERE device_id = %s"
-            cursor.execute(count_query, (device_id,))
-        else:
-            cursor.execute(count_query)
-        total = cursor.fetchone()['total']
+        with profiler.stage('db'):
+            if device_id:
+                count_query += " WHERE device_id = %s"
+                cursor.execute(count_query, (device_id,))
+            else:
+                cursor.execute(count_query)
+            total = cursor.fetchone()['total']
         
         # 데이터 조회 (최신 데이터부터)
         query = """
         SELECT id, temperature, humidity, eco2, tvoc, device_id, timestamp, created_at
         FROM sensor_data 
         """
-        if device_id:
-            query += "WHERE device_id = %s "
-            query += "ORDER BY created_at DESC LIMIT %s OFFSET %s"
-            cursor.execute(query, (device_id, limit, offset))
-        else:
-            query += "ORDER BY created_at DESC LIMIT %s OFFSET %s"
-            cursor.execute(query, (limit, offset))
-        
-        data = cursor.fetchall()
+        with profiler.stage('db'):
+            if device_id:
+                query += "WHERE device_id = %s "
+                query += "ORDER BY created_at DESC LIMIT %s OFFSET %s"
+                cursor.execute(query, (device_id, limit, offset))
+            else:
+                query += "ORDER BY created_at DESC LIMIT %s OFFSET %s"
+                cursor.execute(query, (limit, offset))
+            
+            data = cursor.fetchall()
         
         return jsonify({
             "total_count": total,
@@ -276,6 +527,104 @@ def get_all_data():
             cursor.close()
             connection.close()
 
+def get_range_data():
+    """
+    시간 범위 센서 데이터를 계열별로 조회
+    - max_points 지정 시 LTTB로 계열당 포인트 수를 줄여 전송 (스파이크 유지)
+    - fields로 계열 선택 (기본: temperature,humidity,eco2,tvoc)
+    """
+    try:
+        time_from = parse_time_param(request.args.get('from'))
+        time_to = parse_time_param(request.args.get('to'))
+    except (ValueError, OverflowError, OSError):
+        # 'inf', '1e20' 등 표현 범위를 벗어난 epoch 값 포함
+        return jsonify({
+            "status": "error",
+            "message": "from/to는 epoch 초 또는 'YYYY-MM-DD HH:MM:SS' 형식이어야 합니다"
+        }), 400
+    
+    max_points = request.args.get('max_points')
+    if max_points is not None:
+        try:
+            max_points = int(max_points)
+        except ValueError:
+            max_points = 0
+        if max_points < 3:
+            return jsonify({
+                "status": "error",
+                "message": "max_points는 3 이상의 정수여야 합니다"
+            }), 400
+    
+    fields = request.args.get('fields')
+    fields = [f for f in fields.split(',') if f] if fields else list(SERIES_FIELDS)
+    unknown = [f for f in fields if f not in SERIES_FIELDS]
+    if unknown:
+        return jsonify({
+            "status": "error",
+            "message": f"지원하지 않는 계열: {', '.join(unknown)}"
+        }), 400
+    
+    device_id = request.args.get('device_id')
+    
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({
+            "status": "error",
+            "message": "데이터베이스 연결 실패"
+        }), 500
+    
+    try:
+        cursor = connection.cursor()
+        
+        # 필요한 열만 숫자로 조회 (계열명은 SERIES_FIELDS로 검증됨)
+        conditions = []
+        params = []
+        if time_from:
+            conditions.append("timestamp >= %s")
+            params.append(time_from)
+        if time_to:
+            conditions.append("timestamp <= %s")
+            params.append(time_to)
+        if device_id:
+            conditions.append("device_id = %s")
+            params.append(device_id)
+        
+        query = f"SELECT UNIX_TIMESTAMP(timestamp), {', '.join(fields)} FROM sensor_data"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY timestamp ASC"
+        with profiler.stage('db'):
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
+        
+        with profiler.stage('downsample'):
+            columns = rows_to_columns(rows, ['ts'] + fields)
+            ts = columns.pop('ts')
+            limit = max_points if max_points else len(ts)
+            series = downsample_series(ts, columns, limit)
+        
+        return jsonify({
+            "from": time_from.strftime('%Y-%m-%d %H:%M:%S') if time_from else None,
+            "to": time_to.strftime('%Y-%m-%d %H:%M:%S') if time_to else None,
+            "device_filter": device_id,
+            "total_count": len(rows),
+            "max_points": max_points,
+            "downsampled": bool(max_points and len(rows) > max_points),
+            "series": series
+        })
+        
+    except Error as e:
+        print(f"범위 데이터 조회 오류: {e}")
+        return jsonify({
+            "status": "error",
+            "message": f"데이터 조회 실패: {str(e)}"
+        }), 500
+    
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
 @app.route('/latest', methods=['GET'])
 def get_latest():
     """최신 센서 데이터 조회"""
@@ -453,6 +802,8 @@ if __name__ == '__main__':
     print("- GET /fire-check : 화재 위험도 체크")
     print("- GET /latest : 최신 데이터 조회")
     print("- GET /devices : 등록된 기기 목록")
+    print("- GET /profiles : 규칙 프로파일 조회")
+    print(f"\n클러스터 백엔드: {get_backend_name()}")
     
     # WebSocket 지원으로 서버 실행
     socketio.run(app, host='0.0.0.0', port=8080, debug=True)
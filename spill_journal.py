@@ -0,0 +1,659 @@
+"""
+로컬 스필 저널 모듈
+MySQL 장애/지연 시 수신 데이터를 로컬 JSONL 세그먼트 파일에 추가 기록하고,
+DB 복구 후 백그라운드 재생기(replayer)가 일괄 INSERT로 반영
+- 추가 전용(append-only) 세그먼트, 크기 초과 시 새 세그먼트로 교체
+- fsync는 N건 또는 일정 시간마다 묶어서 수행 (수신 지연 일정 유지)
+- 세그먼트별 재생 위치(.offset)는 실제로 반영된 행까지만 전진 (재시작 시 중복 INSERT/유실 방지)
+- 데이터 오류로 거부된 행은 rejected.jsonl로 옮기고, 연결 끊김 등 일시 오류면 그 위치에서 중단 후 재시도
+- 프로세스마다 JOURNAL_DIR 아래 worker-* 하위 디렉터리를 flock으로 점유 (gunicorn 워커가 같은 디렉터리를 공유해도 안전),
+  잠금이 풀린(종료된 프로세스의) 하위 디렉터리는 살아 있는 워커가 가져와 재생
+- DatabaseGate: 실패 직후 일정 시간 DB 연결 시도를 건너뛰고 바로 저널로 기록,
+  저장 호출에 시간 예산을 두어 DB가 느리면 기다리지 않고 저널로 기록
+
+환경 변수:
+    JOURNAL_DIR=journal           (기본: 이 모듈과 같은 디렉터리의 journal/)
+    JOURNAL_SEGMENT_MAX_BYTES=8388608
+    JOURNAL_FSYNC_BATCH=64
+    JOURNAL_FSYNC_INTERVAL_SEC=1.0
+    JOURNAL_REPLAY_BATCH=500
+    DB_RETRY_INTERVAL_SEC=5
+    DB_INSERT_TIMEOUT_SEC=2
+    DB_INSERT_WORKERS=8
+"""
+
+from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import json
+import os
+import threading
+import time
+import uuid
+
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # Windows: 디렉터리 잠금 없이 단일 프로세스로만 사용
+    fcntl = None
+
+load_dotenv()
+
+SEGMENT_PREFIX = "journal-"
+SEGMENT_SUFFIX = ".jsonl"
+OFFSET_SUFFIX = ".offset"
+REJECTED_FILE = "rejected.jsonl"
+WORKER_DIR_PREFIX = "worker-"
+LOCK_FILE = ".lock"
+CLAIM_LOCK_FILE = ".claim.lock"
+ORPHAN_SCAN_INTERVAL_SEC = 30.0
+DEFAULT_JOURNAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "journal")
+
+# 일괄 저장 결과: (앞에서부터 처리한 행 수, 그중 데이터 오류로 거부된 행 인덱스), 저장 불가 시 None
+BulkInsertResult = Optional[Tuple[int, Sequence[int]]]
+
+
+# -----------------------------
+# DB 가용성 게이트
+# -----------------------------
+class DatabaseGate:
+    """
+    DB 장애 시 매 요청마다 연결 타임아웃을 기다리지 않도록 하는 차단기
+    - 실패 기록 후 retry_interval 동안은 unavailable
+    - 이후 한 번 시도해 성공하면 다시 available
+    - run(): 저장 호출을 시간 예산(insert_timeout) 안에서만 기다림
+    """
+
+    def __init__(
+        self,
+        retry_interval: Optional[float] = None,
+        insert_timeout: Optional[float] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        self.retry_interval = retry_interval if retry_interval is not None else float(os.getenv("DB_RETRY_INTERVAL_SEC", 5))
+        self.insert_timeout = insert_timeout if insert_timeout is not None else float(os.getenv("DB_INSERT_TIMEOUT_SEC", 2))
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or int(os.getenv("DB_INSERT_WORKERS", 8)),
+            thread_name_prefix="db-insert",
+        )
+        self._blocked_until = 0.0
+        self.failures = 0
+        self.timeouts = 0
+
+    def available(self) -> bool:
+        return time.monotonic() >= self._blocked_until
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._blocked_until = time.monotonic() + self.retry_interval
+
+    def record_success(self) -> None:
+        self._blocked_until = 0.0
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Tuple[Any, Optional[Future]]:
+        """
+        fn(*args)를 시간 예산 안에서 실행
+
+        Returns:
+            (결과, None) 또는 시간 초과 시 (None, 아직 진행 중인 Future)
+            - 초과된 호출은 취소할 수 없으므로 뒤늦게 저장될 수 있음 → 저널에 inflight로 넘겨 중복 재생 방지
+        """
+        future = self._executor.submit(fn, *args)
+        try:
+            return future.result(timeout=self.insert_timeout), None
+        except FutureTimeout:
+            self.timeouts += 1
+            print(f"DB 저장 시간 초과 ({self.insert_timeout:.1f}초) - 저널로 기록")
+            return None, future
+
+
+# -----------------------------
+# 디렉터리 잠금
+# -----------------------------
+def _try_lock(path: str, blocking: bool = False):
+    """잠금 파일을 열고 flock. 다른 프로세스가 잡고 있으면 None (blocking이면 대기)"""
+    f = open(path, "a+")
+    if fcntl is None:
+        return f
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+def _first_spilled_at(records: List[Optional[Dict[str, Any]]]) -> Optional[float]:
+    return next((r.get("_spilled_at") for r in records if r), None)
+
+
+# -----------------------------
+# 저널
+# -----------------------------
+class SpillJournal:
+    """
+    추가 전용 JSONL 세그먼트 저널
+    - 첫 사용 시 JOURNAL_DIR/worker-* 하위 디렉터리 하나를 점유 (--preload 마스터에서는 점유하지 않음)
+    - 점유 시 및 주기적으로 주인 없는 하위 디렉터리의 세그먼트를 자기 디렉터리로 옮김
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        *,
+        segment_max_bytes: Optional[int] = None,
+        fsync_batch: Optional[int] = None,
+        fsync_interval: Optional[float] = None,
+    ) -> None:
+        self.root = directory or os.getenv("JOURNAL_DIR") or DEFAULT_JOURNAL_DIR
+        self.segment_max_bytes = segment_max_bytes or int(os.getenv("JOURNAL_SEGMENT_MAX_BYTES", 8 * 1024 * 1024))
+        self.fsync_batch = fsync_batch or int(os.getenv("JOURNAL_FSYNC_BATCH", 64))
+        self.fsync_interval = fsync_interval or float(os.getenv("JOURNAL_FSYNC_INTERVAL_SEC", 1.0))
+
+        os.makedirs(self.root, exist_ok=True)
+        self.directory: Optional[str] = None  # 점유한 하위 디렉터리
+        self._owner_pid: Optional[int] = None
+        self._dir_lock = None
+        self._lock = threading.Lock()
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        self._file = None
+        self._open_seq: Optional[int] = None
+        self._last_seq = 0
+        self._active_bytes = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.appended_total = 0
+        self.pending_records = 0
+        self.rejected_total = 0
+        self._segment_oldest: Dict[str, float] = {}  # 세그먼트별 가장 오래된 미반영 레코드 시각
+        self._inflight: Dict[str, Future] = {}  # 시간 초과 후 아직 진행 중일 수 있는 저장 호출
+
+    # --- 디렉터리 점유 ---
+    def _ensure_claimed(self) -> None:
+        if self._owner_pid == os.getpid():
+            return
+        with self._lock:
+            if self._owner_pid == os.getpid():
+                return
+            # fork로 물려받은 상태(부모의 파일/잠금)는 버리고 새로 점유
+            self._reset_state()
+            with self._claim_lock():
+                own = None
+                for path in self._worker_dirs():
+                    own = _try_lock(os.path.join(path, LOCK_FILE))
+                    if own is not None:
+                        self.directory = path
+                        break
+                if own is None:
+                    self.directory = os.path.join(self.root, f"{WORKER_DIR_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:8]}")
+                    os.makedirs(self.directory)
+                    own = _try_lock(os.path.join(self.directory, LOCK_FILE))
+                self._dir_lock = own
+                self._owner_pid = os.getpid()
+
+                for seq in self._segment_seqs(self.directory):
+                    self._last_seq = max(self._last_seq, seq)
+                    self._count_segment_locked(self._segment_path(seq))
+                # 하위 디렉터리 도입 이전 형식(JOURNAL_DIR 바로 아래)의 세그먼트
+                self._adopt_locked(self.root)
+                self._adopt_orphans_locked()
+
+    def _claim_lock(self):
+        """점유/가져오기 작업을 프로세스 간 직렬화하는 잠금 (with로 사용, 닫으면 해제)"""
+        return _try_lock(os.path.join(self.root, CLAIM_LOCK_FILE), blocking=True)
+
+    def _worker_dirs(self) -> List[str]:
+        paths = []
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name)
+            if name.startswith(WORKER_DIR_PREFIX) and os.path.isdir(path):
+                paths.append(path)
+        return paths
+
+    def _count_segment_locked(self, path: str) -> int:
+        records = _read_segment(path, self.read_offset(path))
+        self.pending_records += len(records)
+        oldest = _first_spilled_at(records)
+        if oldest is not None:
+            self._segment_oldest[path] = oldest
+        return len(records)
+
+    def _adopt_locked(self, source: str) -> int:
+        """source 디렉터리의 세그먼트를 (재생 위치 포함) 자기 디렉터리 끝으로 옮김"""
+        adopted = 0
+        for seq in self._segment_seqs(source):
+            src = os.path.join(source, f"{SEGMENT_PREFIX}{seq:08d}{SEGMENT_SUFFIX}")
+            if not _read_segment(src, self.read_offset(src)):
+                for p in (src, src + OFFSET_SUFFIX):
+                    try:
+                        os.remove(p)
+                    except FileNotFoundError:
+                        pass
+                continue
+            self._last_seq += 1
+            dst = self._segment_path(self._last_seq)
+            os.replace(src, dst)
+            if os.path.exists(src + OFFSET_SUFFIX):
+                os.replace(src + OFFSET_SUFFIX, dst + OFFSET_SUFFIX)
+            adopted += self._count_segment_locked(dst)
+        return adopted
+
+    def _adopt_orphans_locked(self) -> int:
+        adopted = 0
+        for path in self._worker_dirs():
+            if path == self.directory:
+                continue
+            lock = _try_lock(os.path.join(path, LOCK_FILE))
+            if lock is None:
+                continue  # 살아 있는 워커가 사용 중
+            try:
+                adopted += self._adopt_locked(path)
+                os.remove(os.path.join(path, LOCK_FILE))
+                os.rmdir(path)
+            except OSError as e:
+                print(f"저널 디렉터리 정리 오류 ({path}): {e}")
+            finally:
+                lock.close()
+        if adopted:
+            print(f"📼 종료된 워커의 저널 {adopted}건을 가져옴")
+        return adopted
+
+    def adopt_orphans(self) -> int:
+        """종료된 프로세스가 남긴 하위 디렉터리의 세그먼트를 가져옴. 가져온 건수 반환"""
+        self._ensure_claimed()
+        with self._lock, self._claim_lock():
+            return self._adopt_orphans_locked()
+
+    def has_backlog(self) -> bool:
+        """재생할 기록이 있는지 (첫 호출 시 디렉터리 점유 및 남은 세그먼트 집계)"""
+        self._ensure_claimed()
+        return self.pending_records > 0
+
+    def close(self) -> None:
+        """활성 세그먼트를 닫고 디렉터리 점유 해제"""
+        with self._lock:
+            self._seal_locked()
+            if self._dir_lock is not None:
+                self._dir_lock.close()
+                self._dir_lock = None
+            self._owner_pid = None
+
+    # --- 경로 ---
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{seq:08d}{SEGMENT_SUFFIX}")
+
+    @staticmethod
+    def _segment_seqs(directory: str) -> List[int]:
+        seqs = []
+        for name in os.listdir(directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                try:
+                    seqs.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        return sorted(seqs)
+
+    @staticmethod
+    def read_offset(path: str) -> int:
+        try:
+            with open(path + OFFSET_SUFFIX, encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    @staticmethod
+    def _write_offset(path: str, offset: int) -> None:
+        tmp = path + OFFSET_SUFFIX + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path + OFFSET_SUFFIX)
+
+    # --- 쓰기 ---
+    def _open_new_segment(self) -> None:
+        self._last_seq += 1
+        self._open_seq = self._last_seq
+        self._file = open(self._segment_path(self._open_seq), "ab")
+        self._active_bytes = 0
+
+    def append(self, record: Dict[str, Any], inflight: Optional[Future] = None) -> str:
+        """
+        레코드 1건 기록 (fsync는 묶어서 수행)
+
+        Args:
+            inflight: 시간 초과된 저장 호출 - 재생기는 결과를 확인해 이미 저장됐으면 건너뜀
+
+        Returns:
+            저널 참조 문자열 (예: "journal:00000003:17")
+        """
+        self._ensure_claimed()
+        now = time.time()
+        record = dict(record, _spilled_at=now)
+        if inflight is not None:
+            record["_ingest_id"] = uuid.uuid4().hex
+        line = json.dumps(record, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+        with self._lock:
+            if inflight is not None:
+                self._inflight[record["_ingest_id"]] = inflight
+            if self._file is None or self._active_bytes >= self.segment_max_bytes:
+                self._seal_locked()
+                self._open_new_segment()
+            self._file.write(line)
+            self._file.flush()
+            self._active_bytes += len(line)
+            self._unsynced += 1
+            self.appended_total += 1
+            self.pending_records += 1
+            self._segment_oldest.setdefault(self._segment_path(self._open_seq), now)
+            ref = f"journal:{self._open_seq:08d}:{self.appended_total}"
+            if self._unsynced >= self.fsync_batch:
+                self._sync_locked()
+        return ref
+
+    def _sync_locked(self) -> None:
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self, force: bool = False) -> None:
+        """fsync 주기가 지났으면(또는 force) 디스크에 반영"""
+        with self._lock:
+            if force or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync_locked()
+
+    def _seal_locked(self) -> None:
+        if self._file is not None:
+            self._sync_locked()
+            self._file.close()
+            self._file = None
+            self._open_seq = None
+
+    def seal(self) -> None:
+        """활성 세그먼트를 닫아 재생 대상으로 만듦"""
+        self._ensure_claimed()
+        with self._lock:
+            self._seal_locked()
+
+    # --- 읽기(재생) ---
+    def sealed_segments(self) -> List[str]:
+        self._ensure_claimed()
+        with self._lock:
+            active = self._open_seq
+        return [self._segment_path(s) for s in self._segment_seqs(self.directory) if s != active]
+
+    @property
+    def oldest_ts(self) -> Optional[float]:
+        """가장 오래된 미반영 레코드의 기록 시각"""
+        with self._lock:
+            return min(self._segment_oldest.values()) if self._segment_oldest else None
+
+    def inflight_result(self, record: Dict[str, Any]) -> Tuple[bool, bool]:
+        """
+        시간 초과로 기록된 레코드의 원래 저장 호출 상태
+
+        Returns:
+            (완료 여부, 이미 저장됨 여부) - 추적 중이 아니면 (True, False)
+        """
+        ingest_id = record.get("_ingest_id")
+        with self._lock:
+            future = self._inflight.get(ingest_id) if ingest_id else None
+        if future is None:
+            return True, False
+        if not future.done():
+            return False, False
+        try:
+            return True, bool(future.result())
+        except Exception:
+            return True, False
+
+    def mark_replayed(
+        self,
+        path: str,
+        offset: int,
+        count: int,
+        records: Sequence[Optional[Dict[str, Any]]] = (),
+        next_ts: Optional[float] = None,
+    ) -> None:
+        """재생 위치 기록 (next_ts: 남은 첫 레코드의 기록 시각, 없으면 세그먼트 전체 반영)"""
+        self._write_offset(path, offset)
+        with self._lock:
+            self.pending_records = max(0, self.pending_records - count)
+            if next_ts is None:
+                self._segment_oldest.pop(path, None)
+            else:
+                self._segment_oldest[path] = next_ts
+            for record in records:
+                if record and "_ingest_id" in record:
+                    self._inflight.pop(record["_ingest_id"], None)
+
+    def reject(self, records: List[Dict[str, Any]], reason: str) -> None:
+        """DB가 거부한 레코드를 JOURNAL_DIR/rejected.jsonl로 옮김 (수동 확인용)"""
+        now = time.time()
+        lines = b"".join(
+            json.dumps(dict(r, _rejected_at=now, _reason=reason), ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+            for r in records
+        )
+        with open(os.path.join(self.root, REJECTED_FILE), "ab") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            self.rejected_total += len(records)
+
+    def remove_segment(self, path: str) -> None:
+        for p in (path, path + OFFSET_SUFFIX):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._segment_oldest.pop(path, None)
+
+    def stats(self) -> Dict[str, Any]:
+        self._ensure_claimed()
+        seqs = self._segment_seqs(self.directory)
+        size = 0
+        for seq in seqs:
+            try:
+                size += os.path.getsize(self._segment_path(seq))
+            except OSError:
+                pass
+        oldest = self.oldest_ts
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "segments": len(seqs),
+                "bytes": size,
+                "pending_records": self.pending_records,
+                "appended_total": self.appended_total,
+                "rejected_total": self.rejected_total,
+                "lag_sec": round(time.time() - oldest, 1) if oldest else 0.0,
+            }
+
+
+def _read_segment(path: str, offset: int = 0) -> List[Dict[str, Any]]:
+    """세그먼트에서 offset번째 줄부터 레코드 읽기 (잘린 마지막 줄은 무시)"""
+    records = []
+    try:
+        with open(path, "rb") as f:
+            for i, line in enumerate(f):
+                if i < offset:
+                    continue
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    records.append(None)  # 손상된 줄 (위치 유지용)
+    except OSError:
+        pass
+    return records
+
+
+# -----------------------------
+# 재생기
+# -----------------------------
+class JournalReplayer:
+    """
+    DB 복구 시 저널을 일괄 INSERT로 반영하는 백그라운드 스레드
+    - 같은 스레드에서 주기적 fsync도 담당
+    - 저널에 첫 기록이 생길 때 start()로 시작 (여러 번 호출해도 한 번만 시작)
+    """
+
+    def __init__(
+        self,
+        journal: SpillJournal,
+        bulk_insert: Callable[[List[Dict[str, Any]]], BulkInsertResult],
+        gate: DatabaseGate,
+        *,
+        batch_size: Optional[int] = None,
+        interval: float = 1.0,
+    ) -> None:
+        self.journal = journal
+        self.bulk_insert = bulk_insert
+        self.gate = gate
+        self.batch_size = batch_size or int(os.getenv("JOURNAL_REPLAY_BATCH", 500))
+        self.interval = interval
+
+        self.replayed_total = 0
+        self.skipped_total = 0
+        self.already_inserted_total = 0
+        self.last_throughput = 0.0  # records/sec (직전 재생 회차)
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="journal-replayer", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.journal.sync(force=True)
+
+    def _run(self) -> None:
+        next_scan = 0.0
+        while not self._stop.wait(self.interval):
+            self.journal.sync()
+            if time.monotonic() >= next_scan:
+                next_scan = time.monotonic() + ORPHAN_SCAN_INTERVAL_SEC
+                try:
+                    self.journal.adopt_orphans()
+                except OSError as e:
+                    print(f"저널 디렉터리 확인 오류: {e}")
+            if self.journal.pending_records and self.gate.available():
+                try:
+                    self.replay_once()
+                except Exception as e:
+                    self.last_error = str(e)
+                    print(f"저널 재생 오류: {e}")
+
+    def replay_once(self) -> int:
+        """
+        저널 전체를 한 번 반영. 반영한 건수 반환
+        - 일괄 저장이 중간에 멈추면 실제로 처리된 행까지만 위치를 기록하고 중단 (세그먼트 유지)
+        - 시간 초과된 저장 호출이 아직 진행 중인 레코드에 닿으면 다음 회차로 미룸
+        """
+        self.journal.seal()
+        started = time.monotonic()
+        replayed = 0
+
+        for path in self.journal.sealed_segments():
+            offset = self.journal.read_offset(path)
+            records = _read_segment(path, offset)
+            pos = 0
+
+            while pos < len(records):
+                chunk = records[pos:pos + self.batch_size]
+                rows: List[Tuple[int, Dict[str, Any]]] = []  # (chunk 내 위치, 레코드)
+                already: List[int] = []
+                waiting = False
+                for i, record in enumerate(chunk):
+                    if record is None:
+                        continue
+                    done, inserted = self.journal.inflight_result(record)
+                    if not done:
+                        chunk = chunk[:i]
+                        waiting = True
+                        break
+                    if inserted:
+                        already.append(i)
+                    else:
+                        rows.append((i, record))
+
+                advanced = len(chunk)
+                failed = False
+                if rows:
+                    result = self.bulk_insert([r for _, r in rows])
+                    processed, rejected = result if result is not None else (0, ())
+                    processed = min(processed, len(rows))
+                    if rejected:
+                        self.journal.reject([rows[j][1] for j in rejected], "DB 저장 거부")
+                    if processed < len(rows):
+                        advanced = rows[processed][0]
+                        failed = True
+                    else:
+                        self.gate.record_success()
+                    done_rows = processed - len(rejected)
+                    replayed += done_rows
+                    self.replayed_total += done_rows
+
+                self.skipped_total += sum(1 for r in chunk[:advanced] if r is None)
+                self.already_inserted_total += sum(1 for i in already if i < advanced)
+                if advanced:
+                    pos += advanced
+                    self.journal.mark_replayed(
+                        path, offset + pos, advanced, chunk[:advanced], _first_spilled_at(records[pos:])
+                    )
+
+                if failed:
+                    self.gate.record_failure()
+                    self.last_error = "DB 일괄 저장 실패"
+                    self._update_throughput(replayed, started)
+                    return replayed
+                if waiting:
+                    self._update_throughput(replayed, started)
+                    return replayed
+
+            self.journal.remove_segment(path)
+
+        self.last_error = None
+        self._update_throughput(replayed, started)
+        if replayed:
+            print(f"📼 저널 재생 완료: {replayed}건 ({self.last_throughput:.0f}건/초)")
+        return replayed
+
+    def _update_throughput(self, replayed: int, started: float) -> None:
+        elapsed = time.monotonic() - started
+        if replayed and elapsed > 0:
+            self.last_throughput = replayed / elapsed
+
+    def stats(self) -> Dict[str, Any]:
+        result = self.journal.stats()
+        result.update({
+            "replayed_total": self.replayed_total,
+            "skipped_corrupt": self.skipped_total,
+            "skipped_already_inserted": self.already_inserted_total,
+            "db_insert_timeouts": self.gate.timeouts,
+            "replay_throughput_per_sec": round(self.last_throughput, 1),
+            "last_error": self.last_error,
+            "db_available": self.gate.available(),
+        })
+        return result
+
+
+__all__ = [
+    "DatabaseGate",
+    "SpillJournal",
+    "JournalReplayer",
+]
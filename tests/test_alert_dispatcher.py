@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+import alert_dispatcher
+from alert_dispatcher import AlertDispatcher
+
+
+class RecordingSink:
+    name = "recording"
+
+    def __init__(self, gate=None):
+        self.alerts = []
+        self.started = threading.Event()
+        self._gate = gate
+
+    def send(self, alert):
+        self.started.set()
+        if self._gate is not None:
+            self._gate.wait(5)
+        self.alerts.append(alert)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(alert_dispatcher.time, "time", lambda: now[0])
+    return now
+
+
+def _submit(dispatcher, level, device_id="dev"):
+    return dispatcher.submit(device_id, {"risk_level": level}, f"{level} 알림", {})
+
+
+def test_repeated_readings_suppressed_within_cooldown(clock):
+    dispatcher = AlertDispatcher([RecordingSink()], cooldown_sec=60, recovery_sec=300, workers=1)
+
+    assert _submit(dispatcher, "MEDIUM") == "queued"
+    clock[0] += 10
+    assert _submit(dispatcher, "MEDIUM") == "suppressed"
+    clock[0] += 51
+    assert _submit(dispatcher, "MEDIUM") == "queued"
+    assert dispatcher.counts["sent"] == 2
+    assert dispatcher.counts["suppressed"] == 1
+
+
+def test_escalation_bypasses_cooldown_once(clock):
+    dispatcher = AlertDispatcher([RecordingSink()], cooldown_sec=60, recovery_sec=300, workers=1)
+
+    assert _submit(dispatcher, "MEDIUM") == "queued"
+    clock[0] += 5
+    assert _submit(dispatcher, "HIGH") == "escalated"
+    clock[0] += 5
+    assert _submit(dispatcher, "HIGH") == "suppressed"
+    assert dispatcher.counts["escalated"] == 1
+
+
+def test_state_resets_only_after_recovery_period(clock):
+    dispatcher = AlertDispatcher([RecordingSink()], cooldown_sec=600, recovery_sec=120, workers=1)
+
+    assert _submit(dispatcher, "HIGH") == "queued"
+    for _ in range(10):
+        clock[0] += 10
+        assert _submit(dispatcher, "SAFE") == "none"
+    assert _submit(dispatcher, "HIGH") == "suppressed"
+
+    clock[0] += 121
+    assert _submit(dispatcher, "LOW") == "none"
+    assert _submit(dispatcher, "HIGH") == "queued"
+
+
+def test_flapping_around_threshold_sends_single_alert(clock):
+    sink = RecordingSink()
+    dispatcher = AlertDispatcher([sink], cooldown_sec=60, recovery_sec=300, workers=1)
+
+    results = []
+    for i in range(20):
+        results.append(_submit(dispatcher, "MEDIUM" if i % 2 == 0 else "SAFE"))
+        clock[0] += 2
+
+    assert results.count("queued") == 1
+    assert results.count("suppressed") == 9
+
+
+def test_queue_full_releases_cooldown_claim(clock):
+    gate = threading.Event()
+    sink = RecordingSink(gate)
+    dispatcher = AlertDispatcher([sink], cooldown_sec=60, recovery_sec=300, workers=1, queue_size=1)
+    try:
+        assert _submit(dispatcher, "MEDIUM", "busy") == "queued"
+        assert sink.started.wait(5)
+        assert _submit(dispatcher, "MEDIUM", "other") == "queued"
+
+        assert _submit(dispatcher, "MEDIUM") == "dropped"
+        assert dispatcher.counts["dropped"] == 1
+        assert dispatcher.counts["sent"] == 2
+    finally:
+        gate.set()
+    dispatcher._queue.join()
+
+    assert _submit(dispatcher, "MEDIUM") == "queued"
+    dispatcher._queue.join()
+    assert [a["device_id"] for a in sink.alerts] == ["busy", "other", "dev"]
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from anomaly_detector import WARMUP_SEC, AnomalyDetector
+
+
+def _reading(temperature):
+    return {"temperature": temperature, "humidity": 50.0, "eco2": 400.0, "tvoc": 10.0}
+
+
+def _baseline(detector, rng, interval, duration):
+    ts = 0.0
+    for _ in range(int(duration / interval)):
+        ts += interval
+        detector.update("dev", _reading(18.0 + rng.gauss(0, 0.1)), ts)
+    return ts
+
+
+@pytest.mark.parametrize("interval", [5, 30, 60])
+def test_noise_is_not_flagged_after_warmup(interval):
+    rng = random.Random(7)
+    detector = AnomalyDetector()
+    ts = 0.0
+    for _ in range(int(3600 / interval)):
+        ts += interval
+        result = detector.update("dev", _reading(18.0 + rng.gauss(0, 0.1)), ts)
+        assert result["score"] == 0, (ts, result["factors"])
+
+
+def test_no_judgement_during_warmup():
+    detector = AnomalyDetector()
+    detector.update("dev", _reading(18.0), 0.0)
+    for i in range(1, 20):
+        result = detector.update("dev", _reading(18.0 + i), i * 5.0)
+        assert result["score"] == 0
+    assert WARMUP_SEC > 19 * 5.0
+
+
+@pytest.mark.parametrize("interval", [5, 30, 60])
+@pytest.mark.parametrize("rise_per_min", [0.1, 0.3, 0.5])
+def test_slow_smoulder_is_flagged_regardless_of_reporting_interval(interval, rise_per_min):
+    rng = random.Random(1)
+    detector = AnomalyDetector()
+    ts = _baseline(detector, rng, interval, 2 * 3600)
+
+    temperature = 18.0
+    first_flag = None
+    result = None
+    while temperature < 30.0:
+        ts += interval
+        temperature += rise_per_min * interval / 60.0
+        result = detector.update("dev", _reading(temperature + rng.gauss(0, 0.1)), ts)
+        if result["score"] and first_flag is None:
+            first_flag = temperature
+
+    assert first_flag is not None and first_flag < 20.0
+    # 기준선에 흡수되지 않고 30°C까지 계속 이상으로 판정
+    assert result["score"] > 0
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from downsample import downsample_series, lttb_indices, rows_to_columns
+
+
+def test_keeps_first_and_last_points():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50.0)
+    idx = lttb_indices(x, y, 50)
+
+    assert len(idx) == 50
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_spike_survives_downsampling():
+    x = np.arange(10000, dtype=float)
+    y = np.full(10000, 20.0)
+    y[6543] = 80.0  # 화재 스파이크 한 점
+    idx = lttb_indices(x, y, 100)
+
+    assert 6543 in idx
+    assert y[idx].max() == 80.0
+
+
+@pytest.mark.parametrize("n", [3, 4, 5, 7, 10])
+def test_bucket_counts_for_small_inputs(n):
+    x = np.arange(n, dtype=float)
+    y = np.random.default_rng(n).normal(size=n)
+    for n_out in range(3, n + 2):
+        idx = lttb_indices(x, y, n_out)
+        assert len(idx) == min(n_out, n)
+        assert len(set(idx.tolist())) == len(idx)
+        assert idx[0] == 0 and idx[-1] == n - 1
+
+
+def test_n_out_just_below_n():
+    x = np.arange(101, dtype=float)
+    y = np.random.default_rng(0).normal(size=101)
+    idx = lttb_indices(x, y, 100)
+
+    assert len(idx) == 100
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_n_out_below_three_returns_all_points():
+    x = np.arange(10, dtype=float)
+    assert len(lttb_indices(x, x, 2)) == 10
+
+
+def test_nan_values_are_dropped_per_series():
+    ts = np.arange(10, dtype=float)
+    temperature = ts.copy()
+    temperature[[2, 5]] = np.nan
+    humidity = np.full(10, np.nan)
+    series = downsample_series(ts, {"temperature": temperature, "humidity": humidity}, 5)
+
+    assert len(series["temperature"]) == 5
+    assert all(not np.isnan(v) for _, v in series["temperature"])
+    assert series["temperature"][0] == [0.0, 0.0]
+    assert series["temperature"][-1] == [9000.0, 9.0]
+    assert series["humidity"] == []
+
+
+def test_rows_to_columns_converts_none_to_nan():
+    columns = rows_to_columns([(1, None), (2, 3.5)], ["ts", "temperature"])
+
+    assert columns["ts"].tolist() == [1.0, 2.0]
+    assert np.isnan(columns["temperature"][0])
+    assert columns["temperature"][1] == 3.5
@@ -0,0 +1,107 @@
+import time
+
+import ingest_dedupe
+from cluster import LocalStateStore
+from ingest_dedupe import DUPLICATE, IN_FLIGHT, NEW, IngestDeduplicator
+
+
+def _accept(dedupe, device_id, data_id, **kwargs):
+    status, _, ticket = dedupe.begin(device_id, **kwargs)
+    assert status == NEW
+    dedupe.commit(ticket, data_id)
+
+
+def test_retry_after_commit_returns_original_id():
+    dedupe = IngestDeduplicator()
+    _accept(dedupe, "dev", 101, seq=7)
+
+    assert dedupe.begin("dev", seq=7)[:2] == (DUPLICATE, 101)
+    assert dedupe.stats("dev")["dev"]["duplicates"] == 1
+
+
+def test_retry_while_in_flight_is_pending_and_abort_allows_retry():
+    dedupe = IngestDeduplicator()
+    status, _, ticket = dedupe.begin("dev", seq=1)
+    assert status == NEW
+
+    assert dedupe.begin("dev", seq=1)[0] == IN_FLIGHT
+
+    dedupe.abort("dev", ticket)
+    status, _, ticket = dedupe.begin("dev", seq=1)
+    assert status == NEW
+    dedupe.commit(ticket, 5)
+    assert dedupe.begin("dev", seq=1)[:2] == (DUPLICATE, 5)
+
+
+def test_reboot_without_boot_id_resets_sequence():
+    dedupe = IngestDeduplicator(reorder_window=64)
+    for seq in range(0, 500):
+        _accept(dedupe, "dev", seq, seq=seq)
+
+    # 재부팅으로 시퀀스가 0부터 다시 시작 → 이전 부팅의 키와 충돌하지 않아야 함
+    for seq in range(0, 10):
+        status, _, ticket = dedupe.begin("dev", seq=seq)
+        assert status == NEW
+        dedupe.commit(ticket, 1000 + seq)
+
+    stats = dedupe.stats("dev")["dev"]
+    assert stats["resets"] == 1
+    assert stats["highest_seq"] == 9
+    assert stats["duplicates"] == 0
+    # 새 부팅 내 재전송은 여전히 중복으로 식별
+    assert dedupe.begin("dev", seq=3)[:2] == (DUPLICATE, 1003)
+
+
+def test_reboot_with_boot_id_resets_even_for_small_sequences():
+    dedupe = IngestDeduplicator()
+    for seq in range(0, 5):
+        _accept(dedupe, "dev", seq, seq=seq, boot_id="a")
+
+    status, _, _ = dedupe.begin("dev", seq=0, boot_id="b")
+    assert status == NEW
+    assert dedupe.stats("dev")["dev"]["resets"] == 1
+
+
+def test_small_reorder_is_not_a_reset():
+    dedupe = IngestDeduplicator()
+    _accept(dedupe, "dev", 1, seq=10)
+    _accept(dedupe, "dev", 2, seq=12)
+    _accept(dedupe, "dev", 3, seq=11)
+
+    stats = dedupe.stats("dev")["dev"]
+    assert stats["resets"] == 0
+    assert stats["out_of_order"] == 1
+    assert stats["gaps"] == 0
+
+
+def test_shared_store_dedupes_across_workers():
+    store = LocalStateStore()
+    worker_a = IngestDeduplicator(store)
+    worker_b = IngestDeduplicator(store)
+
+    status, _, ticket = worker_a.begin("dev", msg_id="m-1")
+    assert status == NEW
+    assert worker_b.begin("dev", msg_id="m-1")[0] == IN_FLIGHT
+
+    worker_a.commit(ticket, 42)
+    assert worker_b.begin("dev", msg_id="m-1")[:2] == (DUPLICATE, 42)
+
+
+def test_device_tracking_is_bounded():
+    dedupe = IngestDeduplicator(max_devices=3)
+    for i in range(10):
+        _accept(dedupe, f"dev-{i}", i, seq=1)
+
+    assert sorted(dedupe.stats()) == ["dev-7", "dev-8", "dev-9"]
+    # 목록에서 밀려나도 기기별 조회는 공유 저장소에서 가능
+    assert dedupe.stats("dev-0")["dev-0"]["accepted"] == 1
+
+
+def test_device_state_expires(monkeypatch):
+    monkeypatch.setattr(ingest_dedupe, "DEVICE_STATE_TTL_SEC", 0.01)
+    store = LocalStateStore()
+    dedupe = IngestDeduplicator(store)
+    _accept(dedupe, "dev", 1, seq=1)
+
+    time.sleep(0.02)
+    assert store.get("ingest:dev") is None
@@ -0,0 +1,27 @@
+import cProfile
+import pstats
+
+import pytest
+
+from profiling import SORT_KEYS, RequestProfiler
+
+
+def _profiled():
+    profiler = RequestProfiler(sample_rate=1.0, latency_budget_ms=0, routes="")
+    profile = cProfile.Profile()
+    profile.enable()
+    sum(range(1000))
+    profile.disable()
+    profiler._stats["GET /x"] = pstats.Stats(profile)
+    return profiler
+
+
+def test_text_report_accepts_every_sort_key():
+    profiler = _profiled()
+    for key in SORT_KEYS:
+        assert profiler.text_report("GET /x", sort=key)
+
+
+def test_text_report_rejects_unknown_sort_key():
+    with pytest.raises(ValueError):
+        _profiled().text_report("GET /x", sort="bogus")
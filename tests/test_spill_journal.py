@@ -0,0 +1,176 @@
+import os
+from concurrent.futures import Future
+
+import spill_journal
+from spill_journal import DatabaseGate, JournalReplayer, SpillJournal, _read_segment
+
+
+def _journal(tmp_path, n):
+    journal = SpillJournal(str(tmp_path), fsync_batch=1)
+    for i in range(n):
+        journal.append({"device_id": "dev", "temperature": i})
+    journal.seal()
+    return journal
+
+
+def _replayer(journal, bulk_insert, batch_size=10):
+    return JournalReplayer(journal, bulk_insert, DatabaseGate(retry_interval=0), batch_size=batch_size)
+
+
+def test_replay_inserts_everything_and_removes_segment(tmp_path):
+    journal = _journal(tmp_path, 25)
+    inserted = []
+
+    def bulk(rows):
+        inserted.extend(r["temperature"] for r in rows)
+        return len(rows), []
+
+    assert _replayer(journal, bulk).replay_once() == 25
+    assert inserted == list(range(25))
+    assert journal.pending_records == 0
+    assert journal.sealed_segments() == []
+
+
+def test_connection_loss_keeps_segment_and_offset(tmp_path):
+    journal = _journal(tmp_path, 10)
+    replayer = _replayer(journal, lambda rows: None)
+
+    assert replayer.replay_once() == 0
+    [path] = journal.sealed_segments()
+    assert journal.read_offset(path) == 0
+    assert journal.pending_records == 10
+    assert replayer.replayed_total == 0
+
+
+def test_partial_failure_advances_only_processed_rows(tmp_path):
+    journal = _journal(tmp_path, 10)
+    inserted = []
+
+    def flaky(rows):
+        # 4건 처리 후 연결 끊김
+        inserted.extend(r["temperature"] for r in rows[:4])
+        return 4, []
+
+    assert _replayer(journal, flaky).replay_once() == 4
+    [path] = journal.sealed_segments()
+    assert journal.read_offset(path) == 4
+    assert journal.pending_records == 6
+
+    def healthy(rows):
+        inserted.extend(r["temperature"] for r in rows)
+        return len(rows), []
+
+    assert _replayer(journal, healthy).replay_once() == 6
+    assert inserted == list(range(10))
+    assert journal.sealed_segments() == []
+
+
+def test_partial_failure_survives_restart(tmp_path):
+    journal = _journal(tmp_path, 10)
+    _replayer(journal, lambda rows: (3, [])).replay_once()
+
+    journal.close()  # 프로세스 종료 (디렉터리 잠금 해제)
+
+    reopened = SpillJournal(str(tmp_path))
+    assert reopened.has_backlog()
+    assert reopened.pending_records == 7
+    [path] = reopened.sealed_segments()
+    assert [r["temperature"] for r in _read_segment(path, reopened.read_offset(path))] == list(range(3, 10))
+
+
+def test_rejected_rows_move_to_dead_letter_file(tmp_path):
+    journal = _journal(tmp_path, 5)
+
+    assert _replayer(journal, lambda rows: (len(rows), [1, 3])).replay_once() == 3
+    assert journal.sealed_segments() == []
+    rejected = _read_segment(str(tmp_path / "rejected.jsonl"))
+    assert [r["temperature"] for r in rejected] == [1, 3]
+
+
+def test_timed_out_insert_is_not_replayed_twice(tmp_path):
+    journal = SpillJournal(str(tmp_path), fsync_batch=1)
+    late = Future()
+    journal.append({"device_id": "dev", "temperature": 0}, inflight=late)
+    journal.append({"device_id": "dev", "temperature": 1})
+    journal.seal()
+    inserted = []
+
+    def bulk(rows):
+        inserted.extend(r["temperature"] for r in rows)
+        return len(rows), []
+
+    replayer = _replayer(journal, bulk)
+    # 원래 저장 호출이 끝나기 전에는 재생하지 않음
+    assert replayer.replay_once() == 0
+    assert journal.pending_records == 2
+
+    late.set_result(123)  # 뒤늦게 저장 성공
+    assert replayer.replay_once() == 1
+    assert inserted == [1]
+    assert replayer.already_inserted_total == 1
+    assert journal.pending_records == 0
+
+
+def _collect(inserted):
+    def bulk(rows):
+        inserted.extend(r["temperature"] for r in rows)
+        return len(rows), []
+    return bulk
+
+
+def test_workers_sharing_a_directory_do_not_touch_each_others_segments(tmp_path):
+    worker_a = SpillJournal(str(tmp_path), fsync_batch=1)
+    worker_b = SpillJournal(str(tmp_path), fsync_batch=1)
+    worker_a.append({"temperature": 1})
+    for i in range(4):
+        worker_b.append({"temperature": 10 + i})
+    assert worker_a.directory != worker_b.directory
+
+    inserted = []
+    assert _replayer(worker_a, _collect(inserted)).replay_once() == 1
+    assert inserted == [1]
+
+    # B의 열린 세그먼트는 그대로 남아 이후 기록도 유실되지 않음
+    worker_b.append({"temperature": 14})
+    assert worker_b.pending_records == 5
+    assert _replayer(worker_b, _collect(inserted)).replay_once() == 5
+    assert inserted == [1, 10, 11, 12, 13, 14]
+
+
+def test_live_worker_adopts_segments_of_a_dead_worker(tmp_path):
+    survivor = SpillJournal(str(tmp_path), fsync_batch=1)
+    survivor.has_backlog()
+    dead = SpillJournal(str(tmp_path), fsync_batch=1)
+    for i in range(3):
+        dead.append({"temperature": i})
+    dead_dir = dead.directory
+    dead.close()
+
+    assert survivor.adopt_orphans() == 3
+    assert not os.path.exists(dead_dir)
+    inserted = []
+    assert _replayer(survivor, _collect(inserted)).replay_once() == 3
+    assert inserted == [0, 1, 2]
+
+
+def test_lag_tracks_oldest_unreplayed_record(tmp_path, monkeypatch):
+    journal = SpillJournal(str(tmp_path), fsync_batch=1)
+    clock = [1000.0]
+    monkeypatch.setattr(spill_journal.time, "time", lambda: clock[0])
+    for i in range(4):
+        journal.append({"temperature": i})
+        clock[0] += 100.0
+    journal.seal()
+
+    _replayer(journal, lambda rows: (2, [])).replay_once()
+    # 남은 첫 레코드(1200초에 기록)의 나이
+    assert journal.stats()["lag_sec"] == clock[0] - 1200.0
+
+    _replayer(journal, lambda rows: (len(rows), [])).replay_once()
+    assert journal.stats()["lag_sec"] == 0.0
+
+
+def test_default_directory_is_next_to_the_module():
+    assert spill_journal.DEFAULT_JOURNAL_DIR == os.path.join(
+        os.path.dirname(os.path.abspath(spill_journal.__file__)), "journal"
+    )